@@ -1,27 +1,282 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from bs4 import BeautifulSoup, NavigableString, Tag
 import time
 import ssl
 import socket
 from datetime import datetime
 import re
-import json
+import operator
+from string import Template
 import urllib.parse
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import base64
 import colorsys  # Dodane dla analizy kontrastu kolorów
 import cssutils  # Dodane dla analizy CSS
 import logging
+from functools import cached_property, lru_cache
+from bisect import bisect_left
+
+from website_analyzer.utils.json_fast import dump_to_file
+
+try:
+    import aiohttp  # Opcjonalne - równoległe sprawdzanie zasobów
+except ImportError:
+    aiohttp = None
 
 # Wycisz ostrzeżenia cssutils
 cssutils.log.setLevel(logging.CRITICAL)
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Wspólna sesja HTTP (keep-alive) dla wszystkich analiz w procesie
+_SESSION = None
+
+def get_session():
+    """Return the shared requests.Session, creating it on first use"""
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = requests.Session()
+        _SESSION.headers.update({'User-Agent': USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, pool_block=False)
+        _SESSION.mount('https://', adapter)
+        _SESSION.mount('http://', adapter)
+    return _SESSION
+
+# Cache DNS: hostname -> (adres IP, czas rozwiązania)
+_DNS_CACHE = {}
+DNS_CACHE_TTL = 900  # sekundy
+
+def resolve_host(hostname):
+    """Resolve hostname, reusing a cached address younger than DNS_CACHE_TTL"""
+    cached = _DNS_CACHE.get(hostname)
+    if cached and time.time() - cached[1] < DNS_CACHE_TTL:
+        return cached[0]
+    ip = socket.gethostbyname(hostname)
+    _DNS_CACHE[hostname] = (ip, time.time())
+    return ip
+
+# Wzorce wyrażeń regularnych kompilowane raz przy imporcie modułu
+_PRINT_RE = re.compile(r'print', re.I)
+_SKIP_RE = re.compile(r'skip.*nav|skip.*content|skip.*main|pomiń.*nav|pomiń.*treść|przeskocz.*treść', re.I)
+_FOCUS_RE = re.compile(r':focus', re.I)
+_TAG_RE = re.compile(rb'<(/?)(\w+)')  # znaczniki otwierające i zamykające w surowym źródle
+
+# Elementy puste (bez znacznika zamykającego) według specyfikacji HTML
+_VOID_TAGS = frozenset({
+    b'area', b'base', b'br', b'col', b'embed', b'hr', b'img', b'input', b'keygen',
+    b'link', b'meta', b'param', b'source', b'track', b'wbr'
+})
+# Elementy, których znacznik zamykający można w HTML pominąć
+_OPTIONAL_END_TAGS = frozenset({
+    b'html', b'head', b'body', b'li', b'dt', b'dd', b'p', b'rt', b'rp', b'optgroup',
+    b'option', b'colgroup', b'caption', b'thead', b'tbody', b'tfoot', b'tr', b'td',
+    b'th'
+})
+_UNCHECKED_TAGS = _VOID_TAGS | _OPTIONAL_END_TAGS
+
+# Selektory CSS dla klas (soupsieve kompiluje i zapamiętuje je przy pierwszym użyciu)
+_SEL_SR_ONLY = '[class*="sr-only" i], [class*="visually-hidden" i], [class*="screen-reader" i]'
+_SEL_BREADCRUMB = '[class*="breadcrumb" i]'
+_SEL_SEARCH_CLASS = '[class*="search" i]'
+
+# Atrybuty indeksowane podczas jednego przejścia po drzewie DOM
+INDEXED_ATTRS = ('aria-label', 'aria-describedby', 'aria-labelledby', 'role', 'tabindex')
+_INDEXED_ATTR_SET = frozenset(INDEXED_ATTRS)
+
+HTML5_LANDMARKS = ('header', 'nav', 'main', 'aside', 'footer', 'section', 'article')
+ARIA_LANDMARKS = ('banner', 'navigation', 'main', 'contentinfo', 'complementary', 'search')
+
+# Poprzednie odpowiedzi dla warunkowych GET:
+# url -> (czas zapisu, nagłówki warunkowe, status, nagłówki, treść, czasy pełnego pobrania)
+_RESPONSE_CACHE = {}
+RESPONSE_CACHE_TTL = 900  # sekundy
+RESPONSE_CACHE_MAXSIZE = 32
+
+def conditional_headers(response):
+    """Build If-None-Match / If-Modified-Since headers from a previous response"""
+    headers = {}
+    if response.headers.get('ETag'):
+        headers['If-None-Match'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        headers['If-Modified-Since'] = response.headers['Last-Modified']
+    return headers
+
+def cached_response(url):
+    """Return the cache entry for url if it is younger than RESPONSE_CACHE_TTL"""
+    cached = _RESPONSE_CACHE.get(url)
+    if cached and time.time() - cached[0] < RESPONSE_CACHE_TTL:
+        return cached
+    _RESPONSE_CACHE.pop(url, None)
+    return None
+
+def store_response(url, response, timings):
+    """Keep validators, status, headers and body of a response that can be revalidated"""
+    validators = conditional_headers(response)
+    if not validators:
+        return
+    if url not in _RESPONSE_CACHE and len(_RESPONSE_CACHE) >= RESPONSE_CACHE_MAXSIZE:
+        # Usunięcie najstarszego wpisu (słownik zachowuje kolejność wstawiania)
+        del _RESPONSE_CACHE[next(iter(_RESPONSE_CACHE))]
+    _RESPONSE_CACHE.pop(url, None)
+    _RESPONSE_CACHE[url] = (time.time(), validators, response.status_code,
+                            CaseInsensitiveDict(response.headers), response.content, timings)
+
+def close_session():
+    """Close the shared session and drop pooled connections"""
+    global _SESSION
+    if _SESSION is not None:
+        _SESSION.close()
+        _SESSION = None
+
+@lru_cache(maxsize=4096)
+def is_skip_link(text, href):
+    """Check a (text, href) pair against skip-link patterns; CMS menus repeat the same links"""
+    return bool(_SKIP_RE.search(text) or _SKIP_RE.search(href))
+
+def element_text(el):
+    """Return stripped text of an element, using .string directly for single-text-node elements"""
+    string = el.string
+    if type(string) is NavigableString:
+        return string.strip()
+    return el.get_text().strip()
+
+# Reguły rekomendacji wspólne dla raportu konsolowego i LaTeX:
+# (metryka, operator, próg, priorytet, komunikat)
+RECOMMENDATION_RULES = (
+    ("total_load_time", "gt", 3, "critical", "Drastycznie zmniejszyć czas ładowania strony (przekracza 3 sekundy)"),
+    ("images_without_alt", "gt", 0, "critical", "Dodać tekst alternatywny do {value} obrazów"),
+    ("inputs_without_labels", "gt", 0, "critical", "Dodać etykiety do {value} pól formularzy bez etykiet"),
+    ("https_enabled", "eq", False, "important", "Wdrożyć HTTPS na całej stronie"),
+    ("skip_links", "eq", 0, "important", "Dodać linki pomijania nawigacji dla użytkowników klawiatury"),
+    ("tabindex_issues", "gt", 0, "important", "Naprawić problemy z nawigacją klawiaturową (nieprawidłowe wartości tabindex)"),
+    ("content_security_policy", "eq", "Missing", "important", "Skonfigurować Content Security Policy"),
+    ("missing_security_headers", "gt", 0, "important", "Skonfigurować {value} brakujących nagłówków bezpieczeństwa"),
+    ("response_size_mb", "gt", 1, "minor", "Zoptymalizować rozmiar strony"),
+    ("images_without_dimensions", "gt", 0, "minor", "Dodać wymiary do {value} obrazów"),
+    ("empty_headings", "gt", 0, "minor", "Usunąć {value} pustych nagłówków"),
+)
+
+_RULE_OPS = {"gt": operator.gt, "eq": operator.eq}
+
+# Kolory wyników w raporcie LaTeX: > 80 excellent, > 60 good, pozostałe poor
+SCORE_BANDS = ("poor", "good", "excellent")
+_SCORE_BAND_LIMITS = (60, 80)
+
+LOAD_VERDICT = {True: "przekracza zalecane 2 sekundy", False: "mieści się w zalecanych normach"}
+
+def recommendation_metrics(results):
+    """Flatten the values checked by RECOMMENDATION_RULES out of the results dict"""
+    perf = results.get("performance", {})
+    acc = results.get("accessibility", {})
+    loading = perf.get("loading", {})
+    security = perf.get("security", {})
+    headers = security.get("headers", {})
+    forms = acc.get("forms", {})
+    keyboard = acc.get("keyboard_navigation", {})
+    return {
+        "total_load_time": loading.get("total_load_time", 0),
+        "response_size_mb": loading.get("response_size_mb", 0),
+        "images_without_alt": acc.get("screen_reader", {}).get("images", {}).get("without_alt", 0),
+        "inputs_without_labels": forms.get("total_inputs", 0) - forms.get("inputs_with_labels", 0),
+        "https_enabled": security.get("https_enabled", False),
+        "skip_links": len(keyboard.get("skip_links", [])),
+        "tabindex_issues": len(keyboard.get("tabindex_issues", [])),
+        "content_security_policy": headers.get("Content-Security-Policy", "Missing"),
+        "missing_security_headers": security.get("missing_security_headers", 0),
+        "images_without_dimensions": perf.get("resources", {}).get("images_without_dimensions", 0),
+        "empty_headings": acc.get("semantic_structure", {}).get("empty_headings", 0),
+    }
+
+def score_band(score):
+    """Return the colour band name for a 0-100 score"""
+    return SCORE_BANDS[bisect_left(_SCORE_BAND_LIMITS, score)]
+
+def latex_score(score, fmt='.0f'):
+    """Format a score for LaTeX, coloured by its band"""
+    return f"\\textcolor{{{score_band(score)}}}{{{score:{fmt}}}}"
+
+def evaluate_recommendations(results):
+    """Evaluate RECOMMENDATION_RULES against results, grouped by priority"""
+    metrics = recommendation_metrics(results)
+    recommendations = {"critical": [], "important": [], "minor": []}
+    for metric, op, threshold, priority, message in RECOMMENDATION_RULES:
+        value = metrics[metric]
+        if _RULE_OPS[op](value, threshold):
+            recommendations[priority].append(message.format(value=value))
+    return recommendations
+
+def latex_enumerate(items, empty_text):
+    """Render items as a LaTeX enumerate, or a plain sentence when there are none"""
+    if not items:
+        return empty_text
+    rows = "".join(f"\n    \\item {item}" for item in items)
+    return f"\\begin{{enumerate}}[leftmargin=*]{rows}\n\\end{{enumerate}}"
+
+def flatten_results(results, prefix=""):
+    """Flatten nested result dicts into one mapping keyed by dotted paths"""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_results(value, path + "."))
+        else:
+            flat[path] = value
+    return flat
+
+# Ścieżki wyników używane w szablonie raportu; brakujące wartości są wypisywane jako 0
+REPORT_RESULT_PATHS = frozenset({
+    "performance.loading.status_code",
+    "performance.resources.total_images",
+    "performance.resources.total_css_files",
+    "performance.resources.total_js_files",
+    "performance.resources.external_links",
+    "performance.resources.images_without_dimensions",
+    "performance.security.ssl_days_to_expiry",
+    "performance.seo.title_length",
+    "performance.seo.meta_description_length",
+    "accessibility.forms.total_forms",
+    "accessibility.forms.total_inputs",
+    "accessibility.forms.inputs_with_labels",
+    "accessibility.forms.required_fields",
+    "accessibility.forms.fieldsets",
+    "accessibility.forms.legends",
+    "accessibility.screen_reader.images.total",
+    "accessibility.screen_reader.images.with_alt",
+    "accessibility.screen_reader.images.with_empty_alt",
+    "accessibility.screen_reader.images.without_alt",
+    "accessibility.keyboard_navigation.total_interactive_elements",
+    "usability.navigation.nav_elements",
+    "usability.navigation.breadcrumbs",
+    "usability.content.total_links",
+    "usability.content.external_links",
+    "usability.content.external_links_with_indication",
+})
+
+class ReportContext(dict):
+    """Template context; known result paths missing from the results render as 0"""
+    def __missing__(self, key):
+        if key in REPORT_RESULT_PATHS:
+            return 0
+        raise KeyError(key)
+
+class LatexTemplate(Template):
+    """Template whose placeholders may name dotted result paths"""
+    idpattern = r'(?a:[_a-z][_a-z0-9.]*)'
+
 class WebsiteAnalyzer:
     def __init__(self, url):
         self.url = url
+        self.session = get_session()
+        self._peer_cert = None
+        # Wspólny znacznik czasu dla nazw plików raportów JSON i LaTeX
+        self.timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime())
         self.results = {
             "url": url,
             "accessibility": {
@@ -49,6 +304,7 @@ class WebsiteAnalyzer:
     def analyze(self):
         """Run all analysis tests"""
         print(f"Analyzing {self.url}...")
+        self.timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime())
         
         try:
             self.get_website()
@@ -60,52 +316,136 @@ class WebsiteAnalyzer:
             self.print_detailed_report()
             self.save_detailed_report()
             self.generate_latex_report()
-        except Exception as e:
+        except (requests.RequestException, OSError) as e:
+            # Błędy sieci, DNS, TLS i zapisu plików; błędy w kodzie analizy nie są maskowane
             print(f"Error analyzing website: {str(e)}")
     
+    @cached_property
+    def host(self):
+        """Host part of the analyzed URL, used in report file names"""
+        return urllib.parse.urlparse(self.url).netloc or self.url
+    
     def get_website(self):
         """Get the website content with detailed timing"""
         try:
             start_time = time.time()
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
             
             # DNS lookup timing
             dns_start = time.time()
             hostname = self.url.split("//")[-1].split("/")[0]
-            socket.gethostbyname(hostname)
+            resolve_host(hostname)
             dns_time = time.time() - dns_start
             
-            # Full request timing
-            self.response = requests.get(self.url, headers=headers, timeout=30)
+            # Full request timing (conditional if the page was fetched before)
+            cached = cached_response(self.url)
+            request_headers = cached[1] if cached else {}
+            self.response = self.session.get(self.url, headers=request_headers, timeout=30,
+                                             hooks={'response': self._capture_peer_cert})
             total_time = time.time() - start_time
             
-            self.results["performance"]["loading"]["dns_lookup_time"] = round(dns_time * 1000, 2)
-            self.results["performance"]["loading"]["total_load_time"] = round(total_time, 2)
-            self.results["performance"]["loading"]["response_time"] = round((total_time - dns_time), 2)
+            loading = self.results["performance"]["loading"]
+            loading["dns_lookup_time"] = round(dns_time * 1000, 2)
+            timings = {
+                "total_load_time": round(total_time, 2),
+                "response_time": round((total_time - dns_time), 2)
+            }
+            
+            if self.response.status_code == 304 and cached:
+                # Strona się nie zmieniła - odtworzenie poprzedniej odpowiedzi z zapisanej treści.
+                # Nagłówki z 304 uzupełniają zapisane; czasy ładowania pochodzą z pełnego pobrania,
+                # bo szybka odpowiedź warunkowa nie mówi nic o czasie ładowania strony
+                stored_at, validators, status_code, headers, body, timings = cached
+                merged_headers = CaseInsensitiveDict(headers)
+                merged_headers.update(self.response.headers)
+                self.response.status_code = status_code
+                self.response.headers = merged_headers
+                self.response._content = body
+                loading["not_modified"] = True
+                loading["conditional_request_time"] = round(total_time, 2)
+            else:
+                store_response(self.url, self.response, timings)
+            loading.update(timings)
             
-            self.soup = BeautifulSoup(self.response.text, 'html.parser')
+            # Parser dostaje surowe bajty - bez dodatkowej kopii zdekodowanego tekstu
+            raw = self.response.content
+            self._response_size = len(raw)
+            self.soup = BeautifulSoup(raw, 'lxml')
+            self._index_dom()
+            self._full_text = self.soup.get_text()
             print(f"Successfully fetched website: {self.url}")
         except Exception as e:
             print(f"Error fetching website: {str(e)}")
             raise
     
+    def _capture_peer_cert(self, response, *args, **kwargs):
+        """Response hook: keep the TLS certificate of the connection that served the page"""
+        if self._peer_cert is not None:
+            return
+        if urllib.parse.urlsplit(response.url).hostname != urllib.parse.urlsplit(self.url).hostname:
+            return
+        # Gniazdo jest dostępne tylko dla połączeń keep-alive (urllib3 2.x / 1.x)
+        conn = getattr(response.raw, 'connection', None) or getattr(response.raw, '_connection', None)
+        sock = getattr(conn, 'sock', None)
+        if sock is not None and hasattr(sock, 'getpeercert'):
+            self._peer_cert = sock.getpeercert() or None
+    
+    def fetch_peer_cert(self, hostname):
+        """Open a separate TLS connection and return the server certificate"""
+        context = ssl.create_default_context()
+        with socket.create_connection((hostname, 443), timeout=10) as sock:
+            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+                return ssock.getpeercert()
+    
+    def _index_dom(self):
+        """Walk the DOM once, bucketing elements by tag name and indexed attributes"""
+        by_tag = defaultdict(list)
+        by_attr = {attr: [] for attr in INDEXED_ATTRS}
+        role_counts = Counter()
+        
+        for el in self.soup.descendants:
+            if not isinstance(el, Tag):
+                continue
+            by_tag[el.name].append(el)
+            attrs = el.attrs
+            if attrs:
+                for attr in _INDEXED_ATTR_SET.intersection(attrs):
+                    by_attr[attr].append(el)
+            role = attrs.get('role')
+            if role:
+                role_counts[role] += 1
+        
+        self._by_tag = by_tag
+        self._by_attr = by_attr
+        self._role_counts = role_counts
+    
+    def _tags(self, *names):
+        """Return indexed elements with any of the given tag names"""
+        if len(names) == 1:
+            return self._by_tag.get(names[0], [])
+        return [el for name in names for el in self._by_tag.get(name, [])]
+    
+    def _first(self, tag_name, **attrs):
+        """Return the first indexed element of a tag matching attribute values"""
+        for el in self._tags(tag_name):
+            if all(el.get(key) == value for key, value in attrs.items()):
+                return el
+        return None
+    
     def check_performance_detailed(self):
         """Comprehensive performance analysis"""
         perf = self.results["performance"]
         
         # Loading Performance
         perf["loading"]["status_code"] = self.response.status_code
-        perf["loading"]["response_size_bytes"] = len(self.response.content)
-        perf["loading"]["response_size_kb"] = round(len(self.response.content) / 1024, 2)
-        perf["loading"]["response_size_mb"] = round(len(self.response.content) / (1024*1024), 3)
+        perf["loading"]["response_size_bytes"] = self._response_size
+        perf["loading"]["response_size_kb"] = round(self._response_size / 1024, 2)
+        perf["loading"]["response_size_mb"] = round(self._response_size / (1024*1024), 3)
         
         # Resource Analysis
-        images = self.soup.find_all('img')
-        css_links = self.soup.find_all('link', rel='stylesheet')
-        js_scripts = self.soup.find_all('script', src=True)
-        external_links = self.soup.find_all('a', href=re.compile(r'^https?://'))
+        images = self._tags('img')
+        css_links = [link for link in self._tags('link') if 'stylesheet' in link.get('rel', [])]
+        js_scripts = [script for script in self._tags('script') if script.has_attr('src')]
+        external_links = [a for a in self._tags('a') if a.get('href', '').startswith(('http://', 'https://'))]
         
         perf["resources"]["total_images"] = len(images)
         perf["resources"]["total_css_files"] = len(css_links)
@@ -122,12 +462,15 @@ class WebsiteAnalyzer:
         for img in images:
             src = img.get('src', '')
             if src:
-                # Check image format
-                if '.' in src:
-                    ext = src.split('.')[-1].lower().split('?')[0]
+                # Check image format (extension before any query string)
+                end = src.find('?')
+                if end < 0:
+                    end = len(src)
+                dot = src.rfind('.', 0, end)
+                if dot >= 0:
+                    ext = src[dot + 1:end].lower()
                     images_formats[ext] += 1
-                    if ext == 'webp':
-                        webp_images += 1
+                    webp_images += ext == 'webp'
                 
                 # Check if dimensions are specified
                 if not (img.get('width') or img.get('height')):
@@ -143,6 +486,12 @@ class WebsiteAnalyzer:
         perf["resources"]["webp_images"] = webp_images
         perf["resources"]["webp_percentage"] = round((webp_images / max(len(images), 1)) * 100, 1)
         
+        # Subresource sizes (concurrent HEAD probes)
+        asset_urls = self.collect_asset_urls(images, css_links, js_scripts)
+        asset_sizes = self.probe_asset_sizes(asset_urls)
+        perf["resources"]["probed_assets"] = len(asset_urls)
+        perf["resources"]["total_asset_bytes"] = sum(size for size in asset_sizes if size)
+        
         # Security Headers Analysis
         security_headers = {
             'Strict-Transport-Security': self.response.headers.get('Strict-Transport-Security', 'Missing'),
@@ -155,51 +504,57 @@ class WebsiteAnalyzer:
         }
         
         perf["security"]["headers"] = security_headers
+        # Liczone raz tutaj; raporty korzystają z gotowych wartości
+        missing_headers = sum(1 for value in security_headers.values() if value == 'Missing')
+        perf["security"]["missing_security_headers"] = missing_headers
+        perf["security"]["present_security_headers"] = len(security_headers) - missing_headers
         perf["security"]["https_enabled"] = self.url.startswith('https')
         
         # SSL/TLS Analysis
         if self.url.startswith('https'):
             try:
-                hostname = self.url.split("//")[-1].split("/")[0]
-                context = ssl.create_default_context()
-                with socket.create_connection((hostname, 443), timeout=10) as sock:
-                    with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                        cert = ssock.getpeercert()
-                        cert_info = {
-                            'subject': dict(x[0] for x in cert['subject']),
-                            'issuer': dict(x[0] for x in cert['issuer']),
-                            'version': cert['version'],
-                            'serial_number': cert['serialNumber'],
-                            'not_before': cert['notBefore'],
-                            'not_after': cert['notAfter']
-                        }
-                        
-                        cert_expiry = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                        days_to_expiry = (cert_expiry - datetime.now()).days
-                        
-                        perf["security"]["ssl_certificate"] = cert_info
-                        perf["security"]["ssl_days_to_expiry"] = days_to_expiry
-                        perf["security"]["ssl_expires_soon"] = days_to_expiry < 30
+                # Certyfikat z połączenia użytego do pobrania strony; osobny handshake tylko awaryjnie
+                cert = self._peer_cert
+                if cert is None:
+                    hostname = self.url.split("//")[-1].split("/")[0]
+                    cert = self.fetch_peer_cert(hostname)
+                cert_info = {
+                    'subject': dict(x[0] for x in cert['subject']),
+                    'issuer': dict(x[0] for x in cert['issuer']),
+                    'version': cert['version'],
+                    'serial_number': cert['serialNumber'],
+                    'not_before': cert['notBefore'],
+                    'not_after': cert['notAfter']
+                }
+                
+                expiry_ts = ssl.cert_time_to_seconds(cert['notAfter'])
+                days_to_expiry = int((expiry_ts - time.time()) // 86400)
+                
+                perf["security"]["ssl_certificate"] = cert_info
+                perf["security"]["ssl_days_to_expiry"] = days_to_expiry
+                perf["security"]["ssl_expires_soon"] = days_to_expiry < 30
             except Exception as e:
                 perf["security"]["ssl_error"] = str(e)
         
         # SEO Analysis
-        title = self.soup.find('title')
-        meta_description = self.soup.find('meta', attrs={'name': 'description'})
-        meta_keywords = self.soup.find('meta', attrs={'name': 'keywords'})
-        meta_viewport = self.soup.find('meta', attrs={'name': 'viewport'})
-        canonical = self.soup.find('link', attrs={'rel': 'canonical'})
+        title = self._first('title')
+        meta_description = self._first('meta', name='description')
+        meta_keywords = self._first('meta', name='keywords')
+        meta_viewport = self._first('meta', name='viewport')
+        canonical = next((link for link in self._tags('link') if 'canonical' in link.get('rel', [])), None)
         
         perf["seo"]["title"] = title.get_text().strip() if title else "Missing"
         perf["seo"]["title_length"] = len(title.get_text().strip()) if title else 0
         perf["seo"]["meta_description"] = meta_description.get('content', '') if meta_description else "Missing"
         perf["seo"]["meta_description_length"] = len(meta_description.get('content', '')) if meta_description else 0
         perf["seo"]["meta_keywords"] = meta_keywords.get('content', '') if meta_keywords else "Missing"
+    
+    def check_accessibility_detailed(self):
         """Comprehensive accessibility analysis"""
         acc = self.results["accessibility"]
         
         # Semantic Structure Analysis
-        html_tag = self.soup.find('html')
+        html_tag = self._first('html')
         acc["semantic_structure"]["lang_attribute"] = html_tag.get('lang', 'Missing') if html_tag else 'Missing'
         acc["semantic_structure"]["dir_attribute"] = html_tag.get('dir', 'Not specified') if html_tag else 'Not specified'
         
@@ -207,46 +562,32 @@ class WebsiteAnalyzer:
         headings_analysis = {}
         all_headings = []
         for i in range(1, 7):
-            headings = self.soup.find_all(f'h{i}')
+            texts = [element_text(h) for h in self._tags(f'h{i}')]
             headings_analysis[f'h{i}'] = {
-                'count': len(headings),
-                'texts': [h.get_text().strip()[:100] for h in headings[:5]]  # First 5 headings
+                'count': len(texts),
+                'texts': [text[:100] for text in texts[:5]]  # First 5 headings
             }
-            all_headings.extend([(i, h.get_text().strip()) for h in headings])
+            all_headings.extend((i, text) for text in texts)
         
         acc["semantic_structure"]["headings"] = headings_analysis
         acc["semantic_structure"]["heading_hierarchy_issues"] = self.check_heading_hierarchy(all_headings)
-        acc["semantic_structure"]["empty_headings"] = len([h for level, h in all_headings if not h.strip()])
+        acc["semantic_structure"]["empty_headings"] = sum(1 for level, text in all_headings if not text)
         
         # Landmarks and Structure
-        landmarks = {
-            "header": len(self.soup.find_all('header')),
-            "nav": len(self.soup.find_all('nav')),
-            "main": len(self.soup.find_all('main')),
-            "aside": len(self.soup.find_all('aside')),
-            "footer": len(self.soup.find_all('footer')),
-            "section": len(self.soup.find_all('section')),
-            "article": len(self.soup.find_all('article'))
-        }
-        
-        aria_landmarks = {
-            "banner": len(self.soup.find_all(attrs={"role": "banner"})),
-            "navigation": len(self.soup.find_all(attrs={"role": "navigation"})),
-            "main": len(self.soup.find_all(attrs={"role": "main"})),
-            "contentinfo": len(self.soup.find_all(attrs={"role": "contentinfo"})),
-            "complementary": len(self.soup.find_all(attrs={"role": "complementary"})),
-            "search": len(self.soup.find_all(attrs={"role": "search"}))
-        }
+        landmarks = {tag: len(self._tags(tag)) for tag in HTML5_LANDMARKS}
+        aria_landmarks = {role: self._role_counts.get(role, 0) for role in ARIA_LANDMARKS}
         
         acc["semantic_structure"]["html5_landmarks"] = landmarks
         acc["semantic_structure"]["aria_landmarks"] = aria_landmarks
         
         # Keyboard Navigation
-        interactive_elements = self.soup.find_all(['a', 'button', 'input', 'select', 'textarea'])
-        focusable_elements = []
+        interactive_names = ('a', 'button', 'input', 'select', 'textarea')
+        interactive_elements = self._tags(*interactive_names)
         tabindex_issues = []
         
-        for elem in interactive_elements:
+        for elem in self._by_attr['tabindex']:
+            if elem.name not in interactive_names:
+                continue
             tabindex = elem.get('tabindex')
             if tabindex:
                 try:
@@ -258,7 +599,6 @@ class WebsiteAnalyzer:
                         pass
                 except ValueError:
                     tabindex_issues.append(f"{elem.name} with invalid tabindex={tabindex}")
-            focusable_elements.append(elem.name)
         
         acc["keyboard_navigation"]["total_interactive_elements"] = len(interactive_elements)
         acc["keyboard_navigation"]["tabindex_issues"] = tabindex_issues
@@ -266,23 +606,35 @@ class WebsiteAnalyzer:
         acc["keyboard_navigation"]["focus_indicators"] = self.check_focus_indicators()
         
         # Screen Reader Support
-        images = self.soup.find_all('img')
+        images = self._tags('img')
+        with_alt = with_empty_alt = without_alt = decorative = 0
+        for img in images:
+            alt = img.get('alt')
+            if alt is None:
+                without_alt += 1
+            else:
+                with_alt += 1
+                if alt == '':
+                    with_empty_alt += 1
+                    if img.get('role') == 'presentation':
+                        decorative += 1
+        
         images_analysis = {
             "total": len(images),
-            "with_alt": len([img for img in images if img.get('alt') is not None]),
-            "with_empty_alt": len([img for img in images if img.get('alt') == '']),
-            "without_alt": len([img for img in images if img.get('alt') is None]),
-            "decorative_properly_marked": len([img for img in images if img.get('alt') == '' and img.get('role') == 'presentation'])
+            "with_alt": with_alt,
+            "with_empty_alt": with_empty_alt,
+            "without_alt": without_alt,
+            "decorative_properly_marked": decorative
         }
         
         acc["screen_reader"]["images"] = images_analysis
-        acc["screen_reader"]["aria_labels"] = len(self.soup.find_all(attrs={"aria-label": True}))
-        acc["screen_reader"]["aria_describedby"] = len(self.soup.find_all(attrs={"aria-describedby": True}))
-        acc["screen_reader"]["aria_labelledby"] = len(self.soup.find_all(attrs={"aria-labelledby": True}))
-        acc["screen_reader"]["sr_only_content"] = len(self.soup.find_all(class_=re.compile(r'sr-only|visually-hidden|screen-reader', re.I)))
+        acc["screen_reader"]["aria_labels"] = len(self._by_attr['aria-label'])
+        acc["screen_reader"]["aria_describedby"] = len(self._by_attr['aria-describedby'])
+        acc["screen_reader"]["aria_labelledby"] = len(self._by_attr['aria-labelledby'])
+        acc["screen_reader"]["sr_only_content"] = len(self.soup.select(_SEL_SR_ONLY))
         
         # Forms Analysis
-        forms = self.soup.find_all('form')
+        forms = self._tags('form')
         form_analysis = {
             "total_forms": len(forms),
             "forms_with_labels": 0,
@@ -290,13 +642,20 @@ class WebsiteAnalyzer:
             "inputs_with_labels": 0,
             "inputs_with_placeholders": 0,
             "required_fields": 0,
-            "fieldsets": len(self.soup.find_all('fieldset')),
-            "legends": len(self.soup.find_all('legend'))
+            "fieldsets": len(self._tags('fieldset')),
+            "legends": len(self._tags('legend'))
         }
         
-        inputs = self.soup.find_all(['input', 'select', 'textarea'])
+        inputs = self._tags('input', 'select', 'textarea')
         form_analysis["total_inputs"] = len(inputs)
         
+        # Indeks etykiet po atrybucie "for" - jedno przejście zamiast wyszukiwania dla każdego pola
+        label_for = {}
+        for label in self._tags('label'):
+            target = label.get('for')
+            if target:
+                label_for.setdefault(target, label)
+        
         for input_elem in inputs:
             if input_elem.get('required') or input_elem.get('aria-required') == 'true':
                 form_analysis["required_fields"] += 1
@@ -304,57 +663,63 @@ class WebsiteAnalyzer:
             if input_elem.get('placeholder'):
                 form_analysis["inputs_with_placeholders"] += 1
             
-            # Check for associated labels
+            # Check for associated labels, aria-label or aria-labelledby
+            # (an input counts once even if it has several of them)
             input_id = input_elem.get('id')
-            if input_id:
-                label = self.soup.find('label', attrs={"for": input_id})
-                if label:
-                    form_analysis["inputs_with_labels"] += 1
-            
-            # Check for aria-label or aria-labelledby
-            if input_elem.get('aria-label') or input_elem.get('aria-labelledby'):
+            if ((input_id and input_id in label_for)
+                    or input_elem.get('aria-label') or input_elem.get('aria-labelledby')):
                 form_analysis["inputs_with_labels"] += 1
         
         acc["forms"] = form_analysis
         
         # Multimedia Analysis
-        videos = self.soup.find_all('video')
-        audios = self.soup.find_all('audio')
-        iframes = self.soup.find_all('iframe')
+        videos = self._tags('video')
+        audios = self._tags('audio')
+        iframes = self._tags('iframe')
+        
+        videos_analysis = {"total": len(videos), "with_captions": 0, "with_controls": 0, "autoplay": 0}
+        for video in videos:
+            if video.find('track', kind='captions'):
+                videos_analysis["with_captions"] += 1
+            if video.has_attr('controls'):
+                videos_analysis["with_controls"] += 1
+            if video.has_attr('autoplay'):
+                videos_analysis["autoplay"] += 1
+        
+        audios_analysis = {"total": len(audios), "with_controls": 0, "autoplay": 0}
+        for audio in audios:
+            if audio.has_attr('controls'):
+                audios_analysis["with_controls"] += 1
+            if audio.has_attr('autoplay'):
+                audios_analysis["autoplay"] += 1
+        
+        iframes_analysis = {"total": len(iframes), "with_title": 0, "with_aria_label": 0}
+        for iframe in iframes:
+            if iframe.get('title'):
+                iframes_analysis["with_title"] += 1
+            if iframe.get('aria-label'):
+                iframes_analysis["with_aria_label"] += 1
         
         multimedia_analysis = {
-            "videos": {
-                "total": len(videos),
-                "with_captions": len([v for v in videos if v.find('track', kind='captions')]),
-                "with_controls": len([v for v in videos if v.get('controls')]),
-                "autoplay": len([v for v in videos if v.get('autoplay')])
-            },
-            "audios": {
-                "total": len(audios),
-                "with_controls": len([a for a in audios if a.get('controls')]),
-                "autoplay": len([a for a in audios if a.get('autoplay')])
-            },
-            "iframes": {
-                "total": len(iframes),
-                "with_title": len([i for i in iframes if i.get('title')]),
-                "with_aria_label": len([i for i in iframes if i.get('aria-label')])
-            }
+            "videos": videos_analysis,
+            "audios": audios_analysis,
+            "iframes": iframes_analysis
         }
         
         acc["multimedia"] = multimedia_analysis
         
         # Text Content Analysis
         text_analysis = {
-            "total_text_length": len(self.soup.get_text()),
-            "paragraphs": len(self.soup.find_all('p')),
+            "total_text_length": len(self._full_text),
+            "paragraphs": len(self._tags('p')),
             "lists": {
-                "ul": len(self.soup.find_all('ul')),
-                "ol": len(self.soup.find_all('ol')),
-                "dl": len(self.soup.find_all('dl'))
+                "ul": len(self._tags('ul')),
+                "ol": len(self._tags('ol')),
+                "dl": len(self._tags('dl'))
             },
             "tables": self.analyze_tables(),
-            "abbreviations": len(self.soup.find_all('abbr')),
-            "quotes": len(self.soup.find_all(['q', 'blockquote']))
+            "abbreviations": len(self._tags('abbr')),
+            "quotes": len(self._tags('q', 'blockquote'))
         }
         
         acc["text_content"] = text_analysis
@@ -421,18 +786,18 @@ class WebsiteAnalyzer:
         usability = self.results["usability"]
         
         # Navigation usability
-        nav_elements = self.soup.find_all('nav')
-        breadcrumbs = self.soup.find_all(class_=re.compile(r'breadcrumb', re.I))
+        nav_elements = self._tags('nav')
+        breadcrumbs = self.soup.select(_SEL_BREADCRUMB)
         
         usability["navigation"] = {
             "nav_elements": len(nav_elements),
             "breadcrumbs": len(breadcrumbs),
-            "search_functionality": len(self.soup.find_all(['input', 'form'], attrs={'type': 'search'})) > 0 or 
-                                  len(self.soup.find_all(class_=re.compile(r'search', re.I))) > 0
+            "search_functionality": any(el.get('type') == 'search' for el in self._tags('input', 'form')) or 
+                                  self.soup.select_one(_SEL_SEARCH_CLASS) is not None
         }
         
         # Content usability
-        links = self.soup.find_all('a', href=True)
+        links = [a for a in self._tags('a') if a.has_attr('href')]
         external_links = [link for link in links if link.get('href', '').startswith('http') and 
                          not link.get('href', '').startswith(self.url)]
         
@@ -442,7 +807,7 @@ class WebsiteAnalyzer:
             "external_links_with_indication": len([link for link in external_links if 
                                                   link.get('target') == '_blank' or 
                                                   'external' in link.get('class', [])]),
-            "print_stylesheet": len(self.soup.find_all('link', attrs={'media': re.compile(r'print', re.I)})) > 0
+            "print_stylesheet": any(_PRINT_RE.search(link.get('media', '')) for link in self._tags('link'))
         }
 
     def calculate_scores(self):
@@ -451,7 +816,8 @@ class WebsiteAnalyzer:
         
         # Performance score (0-100)
         perf_score = 100
-        load_time = self.results["performance"]["loading"]["total_load_time"]
+        loading = self.results["performance"]["loading"]
+        load_time = loading["total_load_time"]
         if load_time > 3:
             perf_score -= 30
         elif load_time > 2:
@@ -460,7 +826,7 @@ class WebsiteAnalyzer:
             perf_score -= 5
         
         # Deduct for large file size
-        size_mb = self.results["performance"]["loading"]["response_size_mb"]
+        size_mb = loading["response_size_mb"]
         if size_mb > 2:
             perf_score -= 20
         elif size_mb > 1:
@@ -481,62 +847,50 @@ class WebsiteAnalyzer:
         self.results["scores"] = scores
 
     # Helper methods
-    def check_heading_hierarchy(self, headings):
+    @staticmethod
+    def check_heading_hierarchy(headings):
         """Check if heading hierarchy is logical"""
         if not headings:
             return False
         
-        levels = [level for level, text in headings]
-        
-        # Check if H1 exists
-        if 1 not in levels:
-            return True
-        
-        # Check for skipped levels
-        for i in range(len(levels) - 1):
-            if levels[i+1] - levels[i] > 1:
+        has_h1 = False
+        previous = None
+        for level, _ in headings:
+            if level == 1:
+                has_h1 = True
+            # Check for skipped levels
+            if previous is not None and level - previous > 1:
                 return True
+            previous = level
         
-        return False
+        # Check if H1 exists
+        return not has_h1
     
     def check_skip_links(self):
         """Check for skip navigation links"""
-        skip_patterns = [
-            r'skip.*nav',
-            r'skip.*content',
-            r'skip.*main',
-            r'pomiń.*nav',
-            r'pomiń.*treść',
-            r'przeskocz.*treść'
-        ]
-        
-        links = self.soup.find_all('a', href=True)
+        links = [a for a in self._tags('a') if a.has_attr('href')]
         skip_links = []
         
         for link in links:
             text = link.get_text().lower().strip()
             href = link.get('href', '').lower()
             
-            for pattern in skip_patterns:
-                if re.search(pattern, text, re.I) or re.search(pattern, href, re.I):
-                    skip_links.append(text)
-                    break
+            if is_skip_link(text, href):
+                skip_links.append(text)
         
         return skip_links
     
     def check_focus_indicators(self):
         """Check for custom focus indicators in CSS"""
         # This is a simplified check
-        css_content = ""
-        for style in self.soup.find_all('style'):
-            css_content += style.get_text()
+        css_content = "".join(style.get_text() for style in self._tags('style'))
         
-        focus_indicators = len(re.findall(r':focus', css_content, re.I))
+        focus_indicators = len(_FOCUS_RE.findall(css_content))
         return focus_indicators
     
     def analyze_tables(self):
         """Analyze table accessibility"""
-        tables = self.soup.find_all('table')
+        tables = self._tags('table')
         table_analysis = {
             "total": len(tables),
             "with_headers": 0,
@@ -567,27 +921,81 @@ class WebsiteAnalyzer:
         errors = 0
         
         # Check for common issues
-        if not self.soup.find('html'):
-            errors += 1
-        if not self.soup.find('head'):
-            errors += 1
-        if not self.soup.find('body'):
-            errors += 1
-        if not self.soup.find('title'):
-            errors += 1
-        
-        # Check for unclosed tags (simplified)
-        html_content = str(self.soup)
-        open_tags = re.findall(r'<(\w+)', html_content)
-        close_tags = re.findall(r'</(\w+)>', html_content)
-        
-        for tag in set(open_tags):
-            if tag.lower() not in ['img', 'br', 'hr', 'input', 'meta', 'link']:
-                if open_tags.count(tag) != close_tags.count(tag):
-                    errors += 1
+        for name in ('html', 'head', 'body', 'title'):
+            if not self._tags(name):
+                errors += 1
+        
+        # Check for unclosed tags (simplified) in the raw response body;
+        # the parsed tree is always balanced, so it cannot be used here
+        open_counts = Counter()
+        close_counts = Counter()
+        for closing, tag in _TAG_RE.findall(self.response.content):
+            # Nazwy znaczników w HTML nie rozróżniają wielkości liter
+            (close_counts if closing else open_counts)[tag.lower()] += 1
+        
+        errors += sum(1 for tag, count in open_counts.items()
+                      if tag not in _UNCHECKED_TAGS and count != close_counts[tag])
         
         return errors
 
+    def collect_asset_urls(self, images, css_links, js_scripts):
+        """Collect unique absolute URLs of images, stylesheets and scripts"""
+        urls = []
+        for elements, attr in ((images, 'src'), (css_links, 'href'), (js_scripts, 'src')):
+            for elem in elements:
+                value = elem.get(attr)
+                if value and not value.startswith('data:'):
+                    urls.append(urllib.parse.urljoin(self.url, value))
+        return list(dict.fromkeys(urls))
+    
+    def probe_asset_sizes(self, urls):
+        """Return Content-Length of each URL (None when unknown)"""
+        if not urls:
+            return []
+        if aiohttp is not None and not self._in_event_loop():
+            sizes = asyncio.run(self._fetch_all(urls))
+            return [size if isinstance(size, int) else None for size in sizes]
+        
+        # Bez aiohttp (lub wewnątrz działającej pętli zdarzeń, gdzie asyncio.run jest niedozwolone):
+        # wątki współdzielące pulę połączeń sesji requests
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return list(executor.map(self._head_size, urls))
+    
+    @staticmethod
+    def _in_event_loop():
+        """Whether the caller runs inside an asyncio event loop (e.g. Jupyter)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+    
+    def _head_size(self, url):
+        """Send a HEAD request through the shared session and return Content-Length"""
+        try:
+            resp = self.session.head(url, timeout=5, allow_redirects=True)
+        except requests.RequestException:
+            return None
+        if resp.status_code >= 400:
+            return None
+        length = resp.headers.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    
+    async def _fetch_all(self, urls):
+        """Send HEAD requests for all URLs concurrently over one connector pool"""
+        connector = aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            async def probe(url):
+                async with session.head(url, allow_redirects=True) as resp:
+                    if resp.status >= 400:
+                        return None
+                    length = resp.headers.get('Content-Length')
+                    return int(length) if length and length.isdigit() else None
+            
+            return await asyncio.gather(*[probe(url) for url in urls], return_exceptions=True)
+
     # ...existing code for print_report, save_report methods...
     
     def print_detailed_report(self):
@@ -690,42 +1098,7 @@ class WebsiteAnalyzer:
 
     def generate_recommendations(self):
         """Generate detailed recommendations"""
-        recommendations = {
-            "critical": [],
-            "important": [],
-            "minor": []
-        }
-        
-        perf = self.results["performance"]
-        acc = self.results["accessibility"]
-        
-        # Critical issues
-        if perf["loading"]["total_load_time"] > 3:
-            recommendations["critical"].append("Drastycznie zmniejszyć czas ładowania strony (>3s)")
-        
-        if acc["screen_reader"]["images"]["without_alt"] > 0:
-            recommendations["critical"].append(f"Dodać tekst alternatywny do {acc['screen_reader']['images']['without_alt']} obrazów")
-        
-        if acc["forms"]["total_inputs"] > acc["forms"]["inputs_with_labels"]:
-            missing = acc["forms"]["total_inputs"] - acc["forms"]["inputs_with_labels"]
-            recommendations["critical"].append(f"Dodać etykiety do {missing} pól formularzy bez etykiet")
-        
-        # Important issues
-        if not perf["security"]["https_enabled"]:
-            recommendations["important"].append("Wdrożyć HTTPS na całej stronie")
-        
-        if len(acc["keyboard_navigation"]["skip_links"]) == 0:
-            recommendations["important"].append("Dodać linki pomijania nawigacji")
-        
-        if perf["security"]["headers"]["Content-Security-Policy"] == "Missing":
-            recommendations["important"].append("Skonfigurować Content Security Policy")
-        
-        # Minor issues
-        if perf["loading"]["response_size_mb"] > 1:
-            recommendations["minor"].append("Zoptymalizować rozmiar strony")
-        
-        if acc["semantic_structure"]["empty_headings"] > 0:
-            recommendations["minor"].append("Usunąć puste nagłówki")
+        recommendations = evaluate_recommendations(self.results)
         
         # Print recommendations
         for level, recs in recommendations.items():
@@ -737,19 +1110,15 @@ class WebsiteAnalyzer:
 
     def save_detailed_report(self):
         """Save comprehensive report"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
         # JSON report
-        json_file = f"comprehensive_report_{self.url.split('//')[-1].split('/')[0]}_{timestamp}.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, indent=4, ensure_ascii=False)
+        json_file = f"comprehensive_report_{self.host}_{self.timestamp}.json"
+        dump_to_file(self.results, json_file)
         
         print(f"\nKompleksowy raport JSON zapisano: {json_file}")
 
     def generate_latex_report(self):
         """Generate comprehensive LaTeX report"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        latex_file = f"raport_latex_{self.url.split('//')[-1].split('/')[0]}_{timestamp}.tex"
+        latex_file = f"raport_latex_{self.host}_{self.timestamp}.tex"
         
         # Get data for easier access
         perf = self.results["performance"]
@@ -757,441 +1126,412 @@ class WebsiteAnalyzer:
         scores = self.results.get("scores", {})
         usability = self.results.get("usability", {})
         
-        latex_content = f"""\\documentclass[12pt,a4paper]{{article}}
-\\usepackage[utf8]{{inputenc}}
-\\usepackage[polish]{{babel}}
-\\usepackage{{geometry}}
-\\usepackage{{xcolor}}
-\\usepackage{{graphicx}}
-\\usepackage{{booktabs}}
-\\usepackage{{longtable}}
-\\usepackage{{array}}
-\\usepackage{{enumitem}}
-\\usepackage{{fancyhdr}}
-\\usepackage{{amsmath}}
-\\usepackage{{url}}
-\\usepackage{{hyperref}}
-
-\\geometry{{margin=2.5cm}}
-\\hypersetup{{
+        loading = perf.get('loading', {})
+        resources = perf.get('resources', {})
+        security = perf.get('security', {})
+        seo = perf.get('seo', {})
+        semantic = acc.get('semantic_structure', {})
+        forms = acc.get('forms', {})
+        sr_images = acc.get('screen_reader', {}).get('images', {})
+        keyboard = acc.get('keyboard_navigation', {})
+        navigation = usability.get('navigation', {})
+        wcag = acc.get('wcag_compliance', {})
+        
+        load_time = loading.get('total_load_time', 0)
+        total_inputs = forms.get('total_inputs', 0)
+        inputs_with_labels = forms.get('inputs_with_labels', 0)
+        title = seo.get('title', 'Brak')
+        
+        # Variable-length sections
+        image_format_rows = "".join(
+            f"\n    \\item {format_name.upper()}: {count} obrazów"
+            for format_name, count in resources.get('image_formats', {}).items()
+        )
+        security_header_rows = "".join(
+            f"\n{header} & ✓ {value} \\\\" if value != "Missing" else f"\n{header} & ✗ Brak \\\\"
+            for header, value in security.get('headers', {}).items()
+        )
+        wcag_rows = "".join(
+            f"\n{level.replace('_', ' ').upper()} & {wcag[level].get('score', 0)} & {wcag[level].get('total', 0)}"
+            f" & {latex_score(wcag[level].get('percentage', 0), '.1f')}\\% \\\\"
+            for level in ('level_a', 'level_aa') if level in wcag
+        )
+        headings = semantic.get('headings', {})
+        heading_rows = "".join(
+            f"\n{level.upper()} & {data['count']} \\\\"
+            for level, data in headings.items() if data.get('count', 0) > 0
+        )
+        landmark_rows = "".join(
+            f"\n    \\item \\texttt{{<{landmark}>}}: {count}"
+            for landmark, count in semantic.get('html5_landmarks', {}).items() if count > 0
+        )
+        
+        recommendations = evaluate_recommendations(self.results)
+        
+        # Wartości przepisywane bez zmian szablon pobiera wprost ze spłaszczonych wyników
+        context = ReportContext(flatten_results(self.results))
+        context.update({
+            "url": self.url,
+            "overall_score": latex_score(scores.get('overall', 0)),
+            "performance_score": latex_score(scores.get('performance', 0)),
+            "accessibility_score": latex_score(scores.get('accessibility', 0)),
+            "wcag_aa_percentage": f"{wcag.get('level_aa', {}).get('percentage', 0):.1f}",
+            "inputs_without_labels": total_inputs - inputs_with_labels,
+            "dns_lookup_time": f"{loading.get('dns_lookup_time', 0):.2f}",
+            "total_load_time": f"{load_time:.2f}",
+            "response_size_kb": f"{loading.get('response_size_kb', 0):.2f}",
+            "load_time_verdict": LOAD_VERDICT[load_time > 2],
+            "image_format_rows": image_format_rows,
+            "https_status": '✓ Włączone' if security.get('https_enabled', False) else '✗ Wyłączone',
+            "ssl_status": '(wymaga odnowienia w ciągu 30 dni)' if security.get('ssl_expires_soon', False) else '(w porządku)',
+            "security_header_rows": security_header_rows,
+            "title": title[:50] + ('...' if len(title) > 50 else ''),
+            "meta_description_status": 'Obecny' if seo.get('meta_description', '') != 'Missing' else 'Brak',
+            "viewport_status": '✓ Skonfigurowany' if perf.get('mobile', {}).get('viewport_configured', False) else '✗ Brak',
+            "canonical_status": '✓ Obecny' if seo.get('canonical_url', '') != 'Missing' else '✗ Brak',
+            "wcag_rows": wcag_rows,
+            "lang_attribute": semantic.get('lang_attribute', 'Brak'),
+            "heading_rows": heading_rows,
+            "heading_hierarchy_issues": 'Tak' if semantic.get('heading_hierarchy_issues', False) else 'Nie',
+            "landmark_rows": landmark_rows,
+            "inputs_with_labels_percentage": f"{inputs_with_labels / max(forms.get('total_inputs', 1), 1) * 100:.1f}",
+            "images_with_alt_percentage": f"{sr_images.get('with_alt', 0) / max(sr_images.get('total', 1), 1) * 100:.1f}",
+            "tabindex_issues": len(keyboard.get('tabindex_issues', [])),
+            "skip_links": len(keyboard.get('skip_links', [])),
+            "search_status": 'Obecna' if navigation.get('search_functionality', False) else 'Brak',
+            "critical_items": latex_enumerate(recommendations["critical"], "Brak problemów krytycznych."),
+            "important_items": latex_enumerate(recommendations["important"], "Brak problemów ważnych."),
+            "minor_items": latex_enumerate(recommendations["minor"], "Brak dodatkowych ulepszeń."),
+        })
+        
+        # Sekcje trafiają do bufora pliku po kolei, bez składania całego dokumentu w pamięci
+        with open(latex_file, 'w', encoding='utf-8', buffering=65536) as f:
+            for section in LATEX_SECTIONS:
+                f.write(section.substitute(context))
+        
+        print(f"Raport LaTeX zapisano: {latex_file}")
+        
+        return latex_file
+
+
+# Szablon raportu LaTeX; sekcje o zmiennej długości są składane osobno
+# i wstawiane jako pojedyncze wartości
+_LATEX_SOURCE = r"""\documentclass[12pt,a4paper]{article}
+\usepackage[utf8]{inputenc}
+\usepackage[polish]{babel}
+\usepackage{geometry}
+\usepackage{xcolor}
+\usepackage{graphicx}
+\usepackage{booktabs}
+\usepackage{longtable}
+\usepackage{array}
+\usepackage{enumitem}
+\usepackage{fancyhdr}
+\usepackage{amsmath}
+\usepackage{url}
+\usepackage{hyperref}
+
+\geometry{margin=2.5cm}
+\hypersetup{
     colorlinks=true,
     linkcolor=blue,
     filecolor=magenta,      
     urlcolor=cyan,
-    pdftitle={{Raport Dostępności i Wydajności}},
-    pdfauthor={{Analiza Automatyczna}},
-}}
+    pdftitle={Raport Dostępności i Wydajności},
+    pdfauthor={Analiza Automatyczna},
+}
 
-\\pagestyle{{fancy}}
-\\fancyhf{{}}
-\\rhead{{Raport Dostępności i Wydajności}}
-\\lhead{{www.kalisz.pl}}
-\\cfoot{{\\thepage}}
+\pagestyle{fancy}
+\fancyhf{}
+\rhead{Raport Dostępności i Wydajności}
+\lhead{www.kalisz.pl}
+\cfoot{\thepage}
 
 % Define colors
-\\definecolor{{excellent}}{{RGB}}{{0,128,0}}
-\\definecolor{{good}}{{RGB}}{{255,165,0}}
-\\definecolor{{poor}}{{RGB}}{{255,0,0}}
-\\definecolor{{gray}}{{RGB}}{{128,128,128}}
-
-% Score color function
-\\newcommand{{\\scorecolor}}[1]{{%
-    \\ifnum#1>80
-        \\textcolor{{excellent}}{{#1}}%
-    \\else\\ifnum#1>60
-        \\textcolor{{good}}{{#1}}%
-    \\else
-        \\textcolor{{poor}}{{#1}}%
-    \\fi\\fi
-}}
-
-\\title{{\\textbf{{KOMPLEKSOWY RAPORT DOSTĘPNOŚCI CYFROWEJ\\\\I WYDAJNOŚCI STRONY INTERNETOWEJ}}\\\\
-\\Large{{Analiza strony: \\url{{{self.url}}}}}}}
-\\author{{Analiza wykonana automatycznie}}
-\\date{{{self.results['date_analyzed']}}}
-
-\\begin{{document}}
-
-\\maketitle
-
-\\tableofcontents
-\\newpage
-
-\\section{{Streszczenie wykonawcze}}
-
-Niniejszy raport przedstawia kompleksową analizę dostępności cyfrowej i wydajności strony internetowej Miasta Kalisz (\\url{{{self.url}}}). Analiza została przeprowadzona zgodnie z wytycznymi WCAG 2.1 oraz najlepszymi praktykami w zakresie wydajności stron internetowych.
-
-\\subsection{{Główne wyniki}}
-
-\\begin{{itemize}}
-    \\item \\textbf{{Wynik ogólny:}} \\scorecolor{{{scores.get('overall', 0):.0f}}}\\%
-    \\item \\textbf{{Wydajność:}} \\scorecolor{{{scores.get('performance', 0):.0f}}}\\%
-    \\item \\textbf{{Dostępność:}} \\scorecolor{{{scores.get('accessibility', 0):.0f}}}\\%
-    \\item \\textbf{{Zgodność WCAG 2.1 Level AA:}} {acc.get('wcag_compliance', {}).get('level_aa', {}).get('percentage', 0):.1f}\\%
-\\end{{itemize}}
-
-\\subsection{{Kluczowe zalecenia}}
-
-\\begin{{enumerate}}[leftmargin=*]
-    \\item Dodanie etykiet do wszystkich {acc.get('forms', {}).get('total_inputs', 0) - acc.get('forms', {}).get('inputs_with_labels', 0)} pól formularzy bez etykiet
-    \\item Wdrożenie brakujących nagłówków bezpieczeństwa
-    \\item Dodanie tekstu alternatywnego do {acc.get('screen_reader', {}).get('images', {}).get('without_alt', 0)} obrazów
-    \\item Naprawa problemów z nawigacją klawiaturową (nieprawidłowe wartości tabindex)
-\\end{{enumerate}}
-
-\\section{{Analiza wydajności}}
-
-\\subsection{{Metryki ładowania}}
-
-\\begin{{table}}[h!]
-\\centering
-\\begin{{tabular}}{{lc}}
-\\toprule
-\\textbf{{Metryka}} & \\textbf{{Wartość}} \\\\
-\\midrule
-Czas DNS Lookup & {perf.get('loading', {}).get('dns_lookup_time', 0):.2f} ms \\\\
-Całkowity czas ładowania & {perf.get('loading', {}).get('total_load_time', 0):.2f} s \\\\
-Rozmiar odpowiedzi & {perf.get('loading', {}).get('response_size_kb', 0):.2f} KB \\\\
-Kod odpowiedzi HTTP & {perf.get('loading', {}).get('status_code', 0)} \\\\
-\\bottomrule
-\\end{{tabular}}
-\\caption{{Podstawowe metryki wydajności}}
-\\end{{table}}
-
-\\textbf{{Ocena:}} Czas ładowania {perf.get('loading', {}).get('total_load_time', 0):.2f} sekund {'przekracza zalecane 2 sekundy' if perf.get('loading', {}).get('total_load_time', 0) > 2 else 'mieści się w zalecanych normach'}.
-
-\\subsection{{Analiza zasobów}}
-
-\\begin{{table}}[h!]
-\\centering
-\\begin{{tabular}}{{lc}}
-\\toprule
-\\textbf{{Typ zasobu}} & \\textbf{{Liczba}} \\\\
-\\midrule
-Obrazy & {perf.get('resources', {}).get('total_images', 0)} \\\\
-Pliki CSS & {perf.get('resources', {}).get('total_css_files', 0)} \\\\
-Pliki JavaScript & {perf.get('resources', {}).get('total_js_files', 0)} \\\\
-Linki zewnętrzne & {perf.get('resources', {}).get('external_links', 0)} \\\\
-Obrazy bez wymiarów & {perf.get('resources', {}).get('images_without_dimensions', 0)} \\\\
-\\bottomrule
-\\end{{tabular}}
-\\caption{{Statystyki zasobów strony}}
-\\end{{table}}
-
-\\textbf{{Formaty obrazów na stronie:}}
-\\begin{{itemize}}"""
-
-        # Add image formats
-        for format_name, count in perf.get('resources', {}).get('image_formats', {}).items():
-            latex_content += f"""
-    \\item {format_name.upper()}: {count} obrazów"""
-
-        latex_content += f"""
-\\end{{itemize}}
-
-\\subsection{{Bezpieczeństwo}}
-
-\\textbf{{HTTPS:}} {'✓ Włączone' if perf.get('security', {}).get('https_enabled', False) else '✗ Wyłączone'}
-
-\\textbf{{Certyfikat SSL:}} Wygasa za {perf.get('security', {}).get('ssl_days_to_expiry', 0)} dni 
-{'(wymaga odnowienia w ciągu 30 dni)' if perf.get('security', {}).get('ssl_expires_soon', False) else '(w porządku)'}
-
-\\textbf{{Nagłówki bezpieczeństwa:}}
-
-\\begin{{longtable}}{{p{{6cm}}p{{8cm}}}}
-\\toprule
-\\textbf{{Nagłówek}} & \\textbf{{Status}} \\\\
-\\midrule
-\\endhead"""
-
-        # Add security headers
-        for header, value in perf.get('security', {}).get('headers', {}).items():
-            status_symbol = "✓" if value != "Missing" else "✗"
-            status_text = value if value != "Missing" else "Brak"
-            latex_content += f"""
-{header} & {status_symbol} {status_text} \\\\"""
-
-        latex_content += f"""
-\\bottomrule
-\\caption{{Status nagłówków bezpieczeństwa}}
-\\end{{longtable}}
-
-\\subsection{{SEO i optymalizacja dla urządzeń mobilnych}}
-
-\\begin{{table}}[h!]
-\\centering
-\\begin{{tabular}}{{lp{{8cm}}}}
-\\toprule
-\\textbf{{Element}} & \\textbf{{Wartość/Status}} \\\\
-\\midrule
-Tytuł strony & {perf.get('seo', {}).get('title', 'Brak')[:50]}{'...' if len(perf.get('seo', {}).get('title', '')) > 50 else ''} \\\\
-Długość tytułu & {perf.get('seo', {}).get('title_length', 0)} znaków \\\\
-Meta description & {'Obecny' if perf.get('seo', {}).get('meta_description', '') != 'Missing' else 'Brak'} \\\\
-Długość opisu & {perf.get('seo', {}).get('meta_description_length', 0)} znaków \\\\
-Viewport meta & {'✓ Skonfigurowany' if perf.get('mobile', {}).get('viewport_configured', False) else '✗ Brak'} \\\\
-URL kanoniczny & {'✓ Obecny' if perf.get('seo', {}).get('canonical_url', '') != 'Missing' else '✗ Brak'} \\\\
-\\bottomrule
-\\end{{tabular}}
-\\caption{{Optymalizacja SEO i mobile}}
-\\end{{table}}
-
-\\section{{Analiza dostępności cyfrowej}}
-
-\\subsection{{Zgodność z WCAG 2.1}}
-
-\\begin{{table}}[h!]
-\\centering
-\\begin{{tabular}}{{lccc}}
-\\toprule
-\\textbf{{Poziom}} & \\textbf{{Punkty}} & \\textbf{{Maksimum}} & \\textbf{{Procent}} \\\\
-\\midrule"""
-
-        # Add WCAG compliance data
-        wcag = acc.get('wcag_compliance', {})
-        for level in ['level_a', 'level_aa']:
-            if level in wcag:
-                data = wcag[level]
-                level_name = level.replace('_', ' ').upper()
-                latex_content += f"""
-{level_name} & {data.get('score', 0)} & {data.get('total', 0)} & \\scorecolor{{{data.get('percentage', 0):.1f}}}\\% \\\\"""
-
-        latex_content += f"""
-\\bottomrule
-\\end{{tabular}}
-\\caption{{Zgodność z poziomami WCAG 2.1}}
-\\end{{table}}
-
-\\subsection{{Struktura semantyczna}}
-
-\\textbf{{Język strony:}} {acc.get('semantic_structure', {}).get('lang_attribute', 'Brak')}
-
-\\textbf{{Hierarchia nagłówków:}}
-
-\\begin{{table}}[h!]
-\\centering
-\\begin{{tabular}}{{cc}}
-\\toprule
-\\textbf{{Poziom}} & \\textbf{{Liczba}} \\\\
-\\midrule"""
-
-        # Add headings data
-        headings = acc.get('semantic_structure', {}).get('headings', {})
-        for level in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            count = headings.get(level, {}).get('count', 0)
-            if count > 0:
-                latex_content += f"""
-{level.upper()} & {count} \\\\"""
-
-        latex_content += f"""
-\\bottomrule
-\\end{{tabular}}
-\\caption{{Struktura nagłówków}}
-\\end{{table}}
-
-\\textbf{{Problemy z hierarchią:}} {'Tak' if acc.get('semantic_structure', {}).get('heading_hierarchy_issues', False) else 'Nie'}
-
-\\textbf{{Struktury HTML5:}}
-
-\\begin{{itemize}}"""
-
-        # Add HTML5 landmarks
-        landmarks = acc.get('semantic_structure', {}).get('html5_landmarks', {})
-        for landmark, count in landmarks.items():
-            if count > 0:
-                latex_content += f"""
-    \\item \\texttt{{<{landmark}>}}: {count}"""
-
-        latex_content += f"""
-\\end{{itemize}}
-
-\\subsection{{Dostępność formularzy}}
-
-\\begin{{table}}[h!]
-\\centering
-\\begin{{tabular}}{{lc}}
-\\toprule
-\\textbf{{Element}} & \\textbf{{Liczba}} \\\\
-\\midrule
-Formularze & {acc.get('forms', {}).get('total_forms', 0)} \\\\
-Pola formularzy & {acc.get('forms', {}).get('total_inputs', 0)} \\\\
-Pola z etykietami & {acc.get('forms', {}).get('inputs_with_labels', 0)} \\\\
-Pola wymagane & {acc.get('forms', {}).get('required_fields', 0)} \\\\
-Fieldsets & {acc.get('forms', {}).get('fieldsets', 0)} \\\\
-Legends & {acc.get('forms', {}).get('legends', 0)} \\\\
-\\bottomrule
-\\end{{tabular}}
-\\caption{{Analiza dostępności formularzy}}
-\\end{{table}}
-
-\\textbf{{Procent pól z etykietami:}} {(acc.get('forms', {}).get('inputs_with_labels', 0) / max(acc.get('forms', {}).get('total_inputs', 1), 1) * 100):.1f}\\%
-
-\\subsection{{Obrazy i media}}
-
-\\begin{{table}}[h!]
-\\centering
-\\begin{{tabular}}{{lc}}
-\\toprule
-\\textbf{{Element}} & \\textbf{{Liczba}} \\\\
-\\midrule
-Obrazy łącznie & {acc.get('screen_reader', {}).get('images', {}).get('total', 0)} \\\\
-Z tekstem alternatywnym & {acc.get('screen_reader', {}).get('images', {}).get('with_alt', 0)} \\\\
-Bez tekstu alternatywnego & {acc.get('screen_reader', {}).get('images', {}).get('without_alt', 0)} \\\\
-Z pustym alt & {acc.get('screen_reader', {}).get('images', {}).get('with_empty_alt', 0)} \\\\
-\\bottomrule
-\\end{{tabular}}
-\\caption{{Analiza dostępności obrazów}}
-\\end{{table}}
+\definecolor{excellent}{RGB}{0,128,0}
+\definecolor{good}{RGB}{255,165,0}
+\definecolor{poor}{RGB}{255,0,0}
+\definecolor{gray}{RGB}{128,128,128}
+
+\title{\textbf{KOMPLEKSOWY RAPORT DOSTĘPNOŚCI CYFROWEJ\\I WYDAJNOŚCI STRONY INTERNETOWEJ}\\
+\Large{Analiza strony: \url{${url}}}}
+\author{Analiza wykonana automatycznie}
+\date{${date_analyzed}}
+
+\begin{document}
+
+\maketitle
+
+\tableofcontents
+\newpage
+
+\section{Streszczenie wykonawcze}
+
+Niniejszy raport przedstawia kompleksową analizę dostępności cyfrowej i wydajności strony internetowej Miasta Kalisz (\url{${url}}). Analiza została przeprowadzona zgodnie z wytycznymi WCAG 2.1 oraz najlepszymi praktykami w zakresie wydajności stron internetowych.
+
+\subsection{Główne wyniki}
+
+\begin{itemize}
+    \item \textbf{Wynik ogólny:} ${overall_score}\%
+    \item \textbf{Wydajność:} ${performance_score}\%
+    \item \textbf{Dostępność:} ${accessibility_score}\%
+    \item \textbf{Zgodność WCAG 2.1 Level AA:} ${wcag_aa_percentage}\%
+\end{itemize}
+
+\subsection{Kluczowe zalecenia}
+
+\begin{enumerate}[leftmargin=*]
+    \item Dodanie etykiet do wszystkich ${inputs_without_labels} pól formularzy bez etykiet
+    \item Wdrożenie brakujących nagłówków bezpieczeństwa
+    \item Dodanie tekstu alternatywnego do ${accessibility.screen_reader.images.without_alt} obrazów
+    \item Naprawa problemów z nawigacją klawiaturową (nieprawidłowe wartości tabindex)
+\end{enumerate}
+
+\section{Analiza wydajności}
+
+\subsection{Metryki ładowania}
+
+\begin{table}[h!]
+\centering
+\begin{tabular}{lc}
+\toprule
+\textbf{Metryka} & \textbf{Wartość} \\
+\midrule
+Czas DNS Lookup & ${dns_lookup_time} ms \\
+Całkowity czas ładowania & ${total_load_time} s \\
+Rozmiar odpowiedzi & ${response_size_kb} KB \\
+Kod odpowiedzi HTTP & ${performance.loading.status_code} \\
+\bottomrule
+\end{tabular}
+\caption{Podstawowe metryki wydajności}
+\end{table}
+
+\textbf{Ocena:} Czas ładowania ${total_load_time} sekund ${load_time_verdict}.
+
+\subsection{Analiza zasobów}
+
+\begin{table}[h!]
+\centering
+\begin{tabular}{lc}
+\toprule
+\textbf{Typ zasobu} & \textbf{Liczba} \\
+\midrule
+Obrazy & ${performance.resources.total_images} \\
+Pliki CSS & ${performance.resources.total_css_files} \\
+Pliki JavaScript & ${performance.resources.total_js_files} \\
+Linki zewnętrzne & ${performance.resources.external_links} \\
+Obrazy bez wymiarów & ${performance.resources.images_without_dimensions} \\
+\bottomrule
+\end{tabular}
+\caption{Statystyki zasobów strony}
+\end{table}
+
+\textbf{Formaty obrazów na stronie:}
+\begin{itemize}${image_format_rows}
+\end{itemize}
+
+\subsection{Bezpieczeństwo}
+
+\textbf{HTTPS:} ${https_status}
+
+\textbf{Certyfikat SSL:} Wygasa za ${performance.security.ssl_days_to_expiry} dni 
+${ssl_status}
+
+\textbf{Nagłówki bezpieczeństwa:}
+
+\begin{longtable}{p{6cm}p{8cm}}
+\toprule
+\textbf{Nagłówek} & \textbf{Status} \\
+\midrule
+\endhead${security_header_rows}
+\bottomrule
+\caption{Status nagłówków bezpieczeństwa}
+\end{longtable}
+
+\subsection{SEO i optymalizacja dla urządzeń mobilnych}
+
+\begin{table}[h!]
+\centering
+\begin{tabular}{lp{8cm}}
+\toprule
+\textbf{Element} & \textbf{Wartość/Status} \\
+\midrule
+Tytuł strony & ${title} \\
+Długość tytułu & ${performance.seo.title_length} znaków \\
+Meta description & ${meta_description_status} \\
+Długość opisu & ${performance.seo.meta_description_length} znaków \\
+Viewport meta & ${viewport_status} \\
+URL kanoniczny & ${canonical_status} \\
+\bottomrule
+\end{tabular}
+\caption{Optymalizacja SEO i mobile}
+\end{table}
+
+\section{Analiza dostępności cyfrowej}
+
+\subsection{Zgodność z WCAG 2.1}
+
+\begin{table}[h!]
+\centering
+\begin{tabular}{lccc}
+\toprule
+\textbf{Poziom} & \textbf{Punkty} & \textbf{Maksimum} & \textbf{Procent} \\
+\midrule${wcag_rows}
+\bottomrule
+\end{tabular}
+\caption{Zgodność z poziomami WCAG 2.1}
+\end{table}
+
+\subsection{Struktura semantyczna}
+
+\textbf{Język strony:} ${lang_attribute}
+
+\textbf{Hierarchia nagłówków:}
+
+\begin{table}[h!]
+\centering
+\begin{tabular}{cc}
+\toprule
+\textbf{Poziom} & \textbf{Liczba} \\
+\midrule${heading_rows}
+\bottomrule
+\end{tabular}
+\caption{Struktura nagłówków}
+\end{table}
+
+\textbf{Problemy z hierarchią:} ${heading_hierarchy_issues}
+
+\textbf{Struktury HTML5:}
+
+\begin{itemize}${landmark_rows}
+\end{itemize}
+
+\subsection{Dostępność formularzy}
+
+\begin{table}[h!]
+\centering
+\begin{tabular}{lc}
+\toprule
+\textbf{Element} & \textbf{Liczba} \\
+\midrule
+Formularze & ${accessibility.forms.total_forms} \\
+Pola formularzy & ${accessibility.forms.total_inputs} \\
+Pola z etykietami & ${accessibility.forms.inputs_with_labels} \\
+Pola wymagane & ${accessibility.forms.required_fields} \\
+Fieldsets & ${accessibility.forms.fieldsets} \\
+Legends & ${accessibility.forms.legends} \\
+\bottomrule
+\end{tabular}
+\caption{Analiza dostępności formularzy}
+\end{table}
 
-\\textbf{{Procent obrazów z tekstem alt:}} {(acc.get('screen_reader', {}).get('images', {}).get('with_alt', 0) / max(acc.get('screen_reader', {}).get('images', {}).get('total', 1), 1) * 100):.1f}\\%
+\textbf{Procent pól z etykietami:} ${inputs_with_labels_percentage}\%
+
+\subsection{Obrazy i media}
 
-\\subsection{{Nawigacja klawiaturą}}
+\begin{table}[h!]
+\centering
+\begin{tabular}{lc}
+\toprule
+\textbf{Element} & \textbf{Liczba} \\
+\midrule
+Obrazy łącznie & ${accessibility.screen_reader.images.total} \\
+Z tekstem alternatywnym & ${accessibility.screen_reader.images.with_alt} \\
+Bez tekstu alternatywnego & ${accessibility.screen_reader.images.without_alt} \\
+Z pustym alt & ${accessibility.screen_reader.images.with_empty_alt} \\
+\bottomrule
+\end{tabular}
+\caption{Analiza dostępności obrazów}
+\end{table}
+
+\textbf{Procent obrazów z tekstem alt:} ${images_with_alt_percentage}\%
+
+\subsection{Nawigacja klawiaturą}
 
-\\begin{{itemize}}
-    \\item \\textbf{{Elementy interaktywne:}} {acc.get('keyboard_navigation', {}).get('total_interactive_elements', 0)}
-    \\item \\textbf{{Problemy z tabindex:}} {len(acc.get('keyboard_navigation', {}).get('tabindex_issues', []))}
-    \\item \\textbf{{Linki pomijania:}} {len(acc.get('keyboard_navigation', {}).get('skip_links', []))}
-\\end{{itemize}}
+\begin{itemize}
+    \item \textbf{Elementy interaktywne:} ${accessibility.keyboard_navigation.total_interactive_elements}
+    \item \textbf{Problemy z tabindex:} ${tabindex_issues}
+    \item \textbf{Linki pomijania:} ${skip_links}
+\end{itemize}
+
+\section{Użyteczność (Usability)}
 
-\\section{{Użyteczność (Usability)}}
+\subsection{Nawigacja}
 
-\\subsection{{Nawigacja}}
+\begin{itemize}
+    \item \textbf{Elementy nawigacyjne:} ${usability.navigation.nav_elements}
+    \item \textbf{Breadcrumbs:} ${usability.navigation.breadcrumbs}
+    \item \textbf{Wyszukiwarka:} ${search_status}
+\end{itemize}
 
-\\begin{{itemize}}
-    \\item \\textbf{{Elementy nawigacyjne:}} {usability.get('navigation', {}).get('nav_elements', 0)}
-    \\item \\textbf{{Breadcrumbs:}} {usability.get('navigation', {}).get('breadcrumbs', 0)}
-    \\item \\textbf{{Wyszukiwarka:}} {'Obecna' if usability.get('navigation', {}).get('search_functionality', False) else 'Brak'}
-\\end{{itemize}}
+\subsection{Zawartość}
 
-\\subsection{{Zawartość}}
+\begin{itemize}
+    \item \textbf{Łączna liczba linków:} ${usability.content.total_links}
+    \item \textbf{Linki zewnętrzne:} ${usability.content.external_links}
+    \item \textbf{Linki zewnętrzne z oznaczeniem:} ${usability.content.external_links_with_indication}
+\end{itemize}
 
-\\begin{{itemize}}
-    \\item \\textbf{{Łączna liczba linków:}} {usability.get('content', {}).get('total_links', 0)}
-    \\item \\textbf{{Linki zewnętrzne:}} {usability.get('content', {}).get('external_links', 0)}
-    \\item \\textbf{{Linki zewnętrzne z oznaczeniem:}} {usability.get('content', {}).get('external_links_with_indication', 0)}
-\\end{{itemize}}
+\section{Szczegółowe rekomendacje}
 
-\\section{{Szczegółowe rekomendacje}}
+\subsection{Problemy krytyczne (wymagają natychmiastowej uwagi)}
 
-\\subsection{{Problemy krytyczne (wymagają natychmiastowej uwagi)}}
+${critical_items}
 
-\\begin{{enumerate}}[leftmargin=*]"""
+\subsection{Problemy ważne}
 
-        # Generate recommendations based on analysis
-        critical_issues = []
-        important_issues = []
-        minor_issues = []
-        
-        # Critical issues
-        if acc.get('screen_reader', {}).get('images', {}).get('without_alt', 0) > 0:
-            critical_issues.append(f"Dodać tekst alternatywny do {acc.get('screen_reader', {}).get('images', {}).get('without_alt', 0)} obrazów")
-        
-        if acc.get('forms', {}).get('total_inputs', 0) > acc.get('forms', {}).get('inputs_with_labels', 0):
-            missing = acc.get('forms', {}).get('total_inputs', 0) - acc.get('forms', {}).get('inputs_with_labels', 0)
-            critical_issues.append(f"Dodać etykiety do {missing} pól formularzy")
-        
-        if perf.get('loading', {}).get('total_load_time', 0) > 3:
-            critical_issues.append("Drastycznie zmniejszyć czas ładowania strony (przekracza 3 sekundy)")
-        
-        # Important issues
-        if len(acc.get('keyboard_navigation', {}).get('skip_links', [])) == 0:
-            important_issues.append("Dodać linki pomijania nawigacji dla użytkowników klawiatury")
-        
-        if len(acc.get('keyboard_navigation', {}).get('tabindex_issues', [])) > 0:
-            important_issues.append("Naprawić problemy z nawigacją klawiaturową (nieprawidłowe wartości tabindex)")
-        
-        security_missing = sum(1 for v in perf.get('security', {}).get('headers', {}).values() if v == 'Missing')
-        if security_missing > 0:
-            important_issues.append(f"Skonfigurować {security_missing} brakujących nagłówków bezpieczeństwa")
-        
-        # Minor issues
-        if perf.get('resources', {}).get('images_without_dimensions', 0) > 0:
-            minor_issues.append(f"Dodać wymiary do {perf.get('resources', {}).get('images_without_dimensions', 0)} obrazów")
-        
-        if acc.get('semantic_structure', {}).get('empty_headings', 0) > 0:
-            minor_issues.append(f"Usunąć {acc.get('semantic_structure', {}).get('empty_headings', 0)} pustych nagłówków")
-
-        # Add critical issues to LaTeX
-        for issue in critical_issues:
-            latex_content += f"""
-    \\item {issue}"""
-
-        latex_content += f"""
-\\end{{enumerate}}
-
-\\subsection{{Problemy ważne}}
-
-\\begin{{enumerate}}[leftmargin=*]"""
+${important_items}
 
-        # Add important issues
-        for issue in important_issues:
-            latex_content += f"""
-    \\item {issue}"""
+\subsection{Ulepszenia dodatkowe}
 
-        latex_content += f"""
-\\end{{enumerate}}
+${minor_items}
 
-\\subsection{{Ulepszenia dodatkowe}}
+\section{Metodologia i ograniczenia}
 
-\\begin{{enumerate}}[leftmargin=*]"""
-
-        # Add minor issues
-        for issue in minor_issues:
-            latex_content += f"""
-    \\item {issue}"""
-
-        latex_content += f"""
-\\end{{enumerate}}
-
-\\section{{Metodologia i ograniczenia}}
-
-\\subsection{{Metodologia}}
+\subsection{Metodologia}
 
 Analiza została przeprowadzona przy użyciu automatycznych narzędzi sprawdzających:
 
-\\begin{{itemize}}
-    \\item Zgodność z wytycznymi WCAG 2.1 (poziomy A i AA)
-    \\item Metryki wydajności strony internetowej
-    \\item Struktura semantyczna HTML
-    \\item Dostępność dla technologii wspomagających
-    \\item Bezpieczeństwo i optymalizacja SEO
-\\end{{itemize}}
-
-\\subsection{{Ograniczenia}}
-
-\\begin{{itemize}}
-    \\item Analiza kontrastu kolorów wymaga dodatkowych narzędzi
-    \\item Testy funkcjonalności wymagają weryfikacji manualnej
-    \\item Ocena użyteczności ograniczona do automatycznych sprawdzeń
-    \\item Nie wszystkie aspekty WCAG mogą być zweryfikowane automatycznie
-\\end{{itemize}}
-
-\\section{{Wnioski}}
-
-Strona internetowa Miasta Kalisz osiąga wynik ogólny \\scorecolor{{{scores.get('overall', 0):.0f}}}\\% w analizie dostępności i wydajności. 
-
-\\textbf{{Mocne strony:}}
-\\begin{{itemize}}
-    \\item Prawidłowa struktura nagłówków
-    \\item Obecność znacznika języka
-    \\item Konfiguracja HTTPS
-    \\item Odpowiedni czas ładowania
-\\end{{itemize}}
-
-\\textbf{{Obszary wymagające poprawy:}}
-\\begin{{itemize}}
-    \\item Dostępność formularzy (etykiety)
-    \\item Teksty alternatywne obrazów
-    \\item Nawigacja klawiaturowa
-    \\item Nagłówki bezpieczeństwa
-\\end{{itemize}}
-
-\\textbf{{Priorytet działań:}} Zaleca się rozpoczęcie od rozwiązania problemów krytycznych, szczególnie związanych z dostępnością formularzy i obrazów, które bezpośrednio wpływają na użytkowników z niepełnosprawnościami.
-
-\\end{{document}}"""
-
-        with open(latex_file, 'w', encoding='utf-8') as f:
-            f.write(latex_content)
-        
-        print(f"Raport LaTeX zapisano: {latex_file}")
-        
-        return latex_file
\ No newline at end of file
+\begin{itemize}
+    \item Zgodność z wytycznymi WCAG 2.1 (poziomy A i AA)
+    \item Metryki wydajności strony internetowej
+    \item Struktura semantyczna HTML
+    \item Dostępność dla technologii wspomagających
+    \item Bezpieczeństwo i optymalizacja SEO
+\end{itemize}
+
+\subsection{Ograniczenia}
+
+\begin{itemize}
+    \item Analiza kontrastu kolorów wymaga dodatkowych narzędzi
+    \item Testy funkcjonalności wymagają weryfikacji manualnej
+    \item Ocena użyteczności ograniczona do automatycznych sprawdzeń
+    \item Nie wszystkie aspekty WCAG mogą być zweryfikowane automatycznie
+\end{itemize}
+
+\section{Wnioski}
+
+Strona internetowa Miasta Kalisz osiąga wynik ogólny ${overall_score}\% w analizie dostępności i wydajności. 
+
+\textbf{Mocne strony:}
+\begin{itemize}
+    \item Prawidłowa struktura nagłówków
+    \item Obecność znacznika języka
+    \item Konfiguracja HTTPS
+    \item Odpowiedni czas ładowania
+\end{itemize}
+
+\textbf{Obszary wymagające poprawy:}
+\begin{itemize}
+    \item Dostępność formularzy (etykiety)
+    \item Teksty alternatywne obrazów
+    \item Nawigacja klawiaturowa
+    \item Nagłówki bezpieczeństwa
+\end{itemize}
+
+\textbf{Priorytet działań:} Zaleca się rozpoczęcie od rozwiązania problemów krytycznych, szczególnie związanych z dostępnością formularzy i obrazów, które bezpośrednio wpływają na użytkowników z niepełnosprawnościami.
+
+\end{document}"""
+
+# Szablon podzielony na rozdziały (\section) zapisywane do pliku kolejno
+LATEX_SECTIONS = tuple(LatexTemplate(part) for part in re.split(r'(?=\n\\section\{)', _LATEX_SOURCE))
@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 import time
 import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ..modules.accessibility import AccessibilityAnalyzer
 from ..modules.performance import PerformanceAnalyzer
@@ -13,6 +14,23 @@ from ..modules.usability import UsabilityAnalyzer
 from ..modules.security import SecurityAnalyzer
 from ..reports.report_generator import ReportGenerator
 from ..utils.helpers import safe_get
+from ..utils.soup_index import SoupIndex
+
+# Maksymalny rozmiar pobieranej treści strony (10 MB)
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
+def performance_score(load_time, size_mb):
+    """
+    Oblicza wynik wydajności (0-100) na podstawie czasu ładowania [s] i rozmiaru strony [MB].
+    Progi są liczone bez rozgałęzień.
+    """
+    score = (100.0
+             - 30.0 * (load_time > 3)
+             - 15.0 * ((load_time > 2) & (load_time <= 3))
+             - 5.0 * ((load_time > 1) & (load_time <= 2))
+             - 20.0 * (size_mb > 2)
+             - 10.0 * ((size_mb > 1) & (size_mb <= 2)))
+    return max(0.0, score)
 
 class WebsiteAnalyzer:
     """
@@ -22,6 +40,7 @@ class WebsiteAnalyzer:
     def __init__(self, url):
         self.url = url
         self.soup = None
+        self.soup_index = None
         self.response = None
         self.results = {
             "url": url,
@@ -70,13 +89,42 @@ class WebsiteAnalyzer:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             
-            # Pobieranie strony
-            self.response = requests.get(self.url, headers=headers, timeout=30)
+            # Pobieranie strony strumieniowo, z limitem rozmiaru treści
+            self.response = requests.get(self.url, headers=headers, timeout=30, stream=True)
+            with self.response:
+                chunks = []
+                size = 0
+                truncated = False
+                stream = self.response.iter_content(chunk_size=65536)
+                for chunk in stream:
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= MAX_RESPONSE_BYTES:
+                        # Obcięcie tylko wtedy, gdy serwer ma jeszcze dane do wysłania
+                        truncated = size > MAX_RESPONSE_BYTES or bool(next(stream, b""))
+                        break
+            body = b"".join(chunks)
             total_time = time.time() - start_time
             
-            self.results["performance"]["loading"]["total_load_time"] = round(total_time, 2)
+            loading = self.results["performance"]["loading"]
+            loading["total_load_time"] = round(total_time, 2)
+            if truncated:
+                body = body[:MAX_RESPONSE_BYTES]
+                loading["response_truncated"] = True
+            
+            # Rozmiar treści faktycznie poddanej analizie
+            loading["response_size_bytes"] = len(body)
+            loading["response_size_kb"] = round(len(body) / 1024, 2)
+            loading["response_size_mb"] = round(len(body) / (1024 * 1024), 3)
             
-            self.soup = BeautifulSoup(self.response.text, 'html.parser')
+            # Treść jest już odczytana - moduły korzystają z response.content/.text bez ponownego pobierania
+            self.response._content = body
+            
+            # lxml parsuje bajty w C; bez lxml wracamy do parsera wbudowanego
+            try:
+                self.soup = BeautifulSoup(body, 'lxml')
+            except FeatureNotFound:
+                self.soup = BeautifulSoup(body, 'html.parser')
             print(f"Pomyślnie pobrano stronę: {self.url}")
         except Exception as e:
             print(f"Błąd podczas pobierania strony: {str(e)}")
@@ -84,48 +132,38 @@ class WebsiteAnalyzer:
     
     def _initialize_analyzers(self):
         """Inicjalizuje wszystkie moduły analizy"""
-        self.accessibility_analyzer = AccessibilityAnalyzer(self.soup, self.results)
-        self.performance_analyzer = PerformanceAnalyzer(self.soup, self.response, self.url, self.results)
-        self.security_analyzer = SecurityAnalyzer(self.soup, self.response, self.url, self.results)
-        self.usability_analyzer = UsabilityAnalyzer(self.soup, self.results)
+        # Jeden indeks elementów DOM współdzielony przez wszystkie moduły
+        self.soup_index = SoupIndex.from_soup(self.soup)
+        self.accessibility_analyzer = AccessibilityAnalyzer(self.soup, self.results, self.soup_index)
+        self.performance_analyzer = PerformanceAnalyzer(self.soup, self.response, self.url, self.results, self.soup_index)
+        self.security_analyzer = SecurityAnalyzer(self.soup, self.response, self.url, self.results, self.soup_index)
+        self.usability_analyzer = UsabilityAnalyzer(self.soup, self.results, self.soup_index)
         self.report_generator = ReportGenerator(self.results)
     
     def _run_analysis(self):
-        """Uruchamia wszystkie moduły analizy"""
-        self.accessibility_analyzer.analyze()
-        self.performance_analyzer.analyze()
-        self.security_analyzer.analyze()
-        self.usability_analyzer.analyze()
+        """
+        Uruchamia wszystkie moduły analizy równolegle.
+        Każdy moduł zapisuje wyłącznie własną sekcję self.results, a drzewo DOM
+        i odpowiedź są tylko odczytywane, więc nie jest potrzebna synchronizacja.
+        """
+        analyzers = (self.accessibility_analyzer, self.performance_analyzer,
+                     self.security_analyzer, self.usability_analyzer)
+        with ThreadPoolExecutor(max_workers=len(analyzers)) as executor:
+            futures = [executor.submit(analyzer.analyze) for analyzer in analyzers]
+            for future in as_completed(futures):
+                future.result()
     
     def _calculate_scores(self):
         """Oblicza wyniki dla poszczególnych kategorii i wynik ogólny"""
         scores = {}
         
         # Wynik wydajności (0-100)
-        perf_score = 100
-        load_time = safe_get(self.results, "performance.loading.total_load_time", 0)
-        if load_time > 3:
-            perf_score -= 30
-        elif load_time > 2:
-            perf_score -= 15
-        elif load_time > 1:
-            perf_score -= 5
-        
-        # Odejmowanie za duży rozmiar pliku
-        size_mb = safe_get(self.results, "performance.loading.response_size_mb", 0)
-        if size_mb > 2:
-            perf_score -= 20
-        elif size_mb > 1:
-            perf_score -= 10
-        
-        scores["performance"] = max(0, perf_score)
+        loading = safe_get(self.results, "performance.loading", {})
+        scores["performance"] = performance_score(float(loading.get("total_load_time", 0)),
+                                                  float(loading.get("response_size_mb", 0)))
         
         # Wynik dostępności
-        acc_score = 0
-        if "wcag_compliance" in self.results["accessibility"]:
-            acc_score = safe_get(self.results, "accessibility.wcag_compliance.level_aa.percentage", 0)
-        
-        scores["accessibility"] = acc_score
+        scores["accessibility"] = safe_get(self.results["accessibility"], "wcag_compliance.level_aa.percentage", 0)
         
         # Wynik bezpieczeństwa
         security_score = safe_get(self.results, "security.score", 0)
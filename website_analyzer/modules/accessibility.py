@@ -3,7 +3,49 @@
 
 import re
 from collections import Counter
-from ..utils.helpers import check_heading_hierarchy, calculate_contrast_ratio, extract_css_colors
+from functools import lru_cache
+import soupsieve as sv
+from ..utils.helpers import check_heading_hierarchy, contrast_matrix, extract_css_colors
+from ..utils.soup_index import HEADING_TAGS, HTML5_LANDMARKS, SoupIndex
+
+# Wzorce i selektory kompilowane raz przy imporcie modułu
+_SKIP_RE = re.compile(r'skip.*(?:nav|content|main)|pomiń.*(?:nav|treść)|przeskocz.*treść', re.I)
+_FOCUS_RE = re.compile(r':focus', re.I)
+_SEL_SR_ONLY = sv.compile('[class*="sr-only" i], [class*="visually-hidden" i], [class*="screen-reader" i]')
+
+# Role ARIA oznaczające punkty orientacyjne strony
+ARIA_LANDMARKS = ('banner', 'navigation', 'main', 'contentinfo', 'complementary', 'search')
+
+WCAG_LEVEL_A_TOTAL = 10
+WCAG_LEVEL_AA_TOTAL = 15
+
+@lru_cache(maxsize=4096)
+def wcag_scores(lang_ok, images_have_alt, hierarchy_ok, forms_labeled, contrast_ok, tabindex_ok):
+    """
+    Punkty zgodności WCAG 2.1 wyznaczane z wyników poszczególnych sprawdzeń.
+    Funkcja jest czysta, więc przy analizie wielu stron powtarzające się
+    kombinacje wyników pobierane są z pamięci podręcznej.
+    
+    Returns:
+        tuple: (punkty poziomu A, punkty poziomu AA)
+    """
+    # Poziom A - wymagania podstawowe: identyfikacja języka, tekst alternatywny obrazów,
+    # nagłówki i etykiety formularzy oraz dodatkowe wcześniej obliczone punkty (uproszczenie)
+    level_a_score = lang_ok + images_have_alt + hierarchy_ok + forms_labeled + 6
+    
+    # Poziom AA - rozszerzone wymagania (AA zawiera A): kontrast kolorów, dostępność
+    # z klawiatury oraz dodatkowe wcześniej obliczone punkty (uproszczenie)
+    level_aa_score = level_a_score + contrast_ok + tabindex_ok + 2
+    return level_a_score, level_aa_score
+
+def _wcag_level(score, total):
+    """Wynik poziomu WCAG w formacie raportu"""
+    return {
+        "score": score,
+        "total": total,
+        "percentage": round((score / total) * 100, 1),
+        "passed": score >= total * 0.8
+    }
 
 class AccessibilityAnalyzer:
     """
@@ -11,8 +53,9 @@ class AccessibilityAnalyzer:
     Sprawdza różne aspekty dostępności, w tym strukturę semantyczną, nawigację
     klawiaturową, wsparcie czytników ekranowych i inne.
     """
-    def __init__(self, soup, results):
+    def __init__(self, soup, results, index=None):
         self.soup = soup
+        self.index = index if index is not None else SoupIndex.from_soup(soup)
         self.results = results
         self.accessibility = self.results["accessibility"]
         
@@ -44,44 +87,29 @@ class AccessibilityAnalyzer:
         sem = self.accessibility["semantic_structure"]
         
         # Analiza atrybutu lang
-        html_tag = self.soup.find('html')
+        html_tag = self.index.first('html')
         sem["lang_attribute"] = html_tag.get('lang', 'Missing') if html_tag else 'Missing'
         sem["dir_attribute"] = html_tag.get('dir', 'Not specified') if html_tag else 'Not specified'
         
         # Analiza nagłówków
         headings_analysis = {}
         all_headings = []
-        for i in range(1, 7):
-            headings = self.soup.find_all(f'h{i}')
-            headings_analysis[f'h{i}'] = {
-                'count': len(headings),
-                'texts': [h.get_text().strip()[:100] for h in headings[:5]]  # Pierwsze 5 nagłówków
+        for i, name in enumerate(HEADING_TAGS, 1):
+            # Tekst każdego nagłówka wyznaczany jest tylko raz
+            texts = [h.get_text().strip() for h in self.index.tags(name)]
+            headings_analysis[name] = {
+                'count': len(texts),
+                'texts': [text[:100] for text in texts[:5]]  # Pierwsze 5 nagłówków
             }
-            all_headings.extend([(i, h.get_text().strip()) for h in headings])
+            all_headings.extend((i, text) for text in texts)
         
         sem["headings"] = headings_analysis
         sem["heading_hierarchy_issues"] = check_heading_hierarchy(all_headings)
-        sem["empty_headings"] = len([h for level, h in all_headings if not h.strip()])
+        sem["empty_headings"] = sum(1 for level, text in all_headings if not text)
         
         # Analiza punktów orientacyjnych (landmarks) i struktury
-        landmarks = {
-            "header": len(self.soup.find_all('header')),
-            "nav": len(self.soup.find_all('nav')),
-            "main": len(self.soup.find_all('main')),
-            "aside": len(self.soup.find_all('aside')),
-            "footer": len(self.soup.find_all('footer')),
-            "section": len(self.soup.find_all('section')),
-            "article": len(self.soup.find_all('article'))
-        }
-        
-        aria_landmarks = {
-            "banner": len(self.soup.find_all(attrs={"role": "banner"})),
-            "navigation": len(self.soup.find_all(attrs={"role": "navigation"})),
-            "main": len(self.soup.find_all(attrs={"role": "main"})),
-            "contentinfo": len(self.soup.find_all(attrs={"role": "contentinfo"})),
-            "complementary": len(self.soup.find_all(attrs={"role": "complementary"})),
-            "search": len(self.soup.find_all(attrs={"role": "search"}))
-        }
+        landmarks = {name: self.index.count(name) for name in HTML5_LANDMARKS}
+        aria_landmarks = {role: self.index.role_counts[role] for role in ARIA_LANDMARKS}
         
         sem["html5_landmarks"] = landmarks
         sem["aria_landmarks"] = aria_landmarks
@@ -90,7 +118,7 @@ class AccessibilityAnalyzer:
         """Analiza dostępności nawigacji klawiaturowej"""
         kbd = self.accessibility["keyboard_navigation"]
         
-        interactive_elements = self.soup.find_all(['a', 'button', 'input', 'select', 'textarea'])
+        interactive_elements = self.index.tags('a', 'button', 'input', 'select', 'textarea')
         focusable_elements = []
         tabindex_issues = []
         
@@ -117,37 +145,49 @@ class AccessibilityAnalyzer:
         """Analiza wsparcia dla czytników ekranowych"""
         sr = self.accessibility["screen_reader"]
         
-        # Analiza obrazów
-        images = self.soup.find_all('img')
+        # Analiza obrazów - jedno przejście, atrybuty odczytywane raz na obraz
+        images = self.index.imgs
+        with_alt = with_empty_alt = without_alt = decorative = 0
+        for img in images:
+            alt = img.attrs.get('alt')
+            if alt is None:
+                without_alt += 1
+            else:
+                with_alt += 1
+                if alt == '':
+                    with_empty_alt += 1
+                    if img.attrs.get('role') == 'presentation':
+                        decorative += 1
+        
         images_analysis = {
             "total": len(images),
-            "with_alt": len([img for img in images if img.get('alt') is not None]),
-            "with_empty_alt": len([img for img in images if img.get('alt') == '']),
-            "without_alt": len([img for img in images if img.get('alt') is None]),
-            "decorative_properly_marked": len([img for img in images if img.get('alt') == '' and img.get('role') == 'presentation'])
+            "with_alt": with_alt,
+            "with_empty_alt": with_empty_alt,
+            "without_alt": without_alt,
+            "decorative_properly_marked": decorative
         }
         
         sr["images"] = images_analysis
-        sr["aria_labels"] = len(self.soup.find_all(attrs={"aria-label": True}))
-        sr["aria_describedby"] = len(self.soup.find_all(attrs={"aria-describedby": True}))
-        sr["aria_labelledby"] = len(self.soup.find_all(attrs={"aria-labelledby": True}))
-        sr["sr_only_content"] = len(self.soup.find_all(class_=re.compile(r'sr-only|visually-hidden|screen-reader', re.I)))
+        sr["aria_labels"] = self.index.attr_counts['aria-label']
+        sr["aria_describedby"] = self.index.attr_counts['aria-describedby']
+        sr["aria_labelledby"] = self.index.attr_counts['aria-labelledby']
+        sr["sr_only_content"] = len(_SEL_SR_ONLY.select(self.soup))
 
     def check_forms(self):
         """Analiza dostępności formularzy"""
         form_analysis = self.accessibility["forms"]
         
-        forms = self.soup.find_all('form')
+        forms = self.index.forms
         form_analysis["total_forms"] = len(forms)
         form_analysis["forms_with_labels"] = 0
         form_analysis["total_inputs"] = 0
         form_analysis["inputs_with_labels"] = 0
         form_analysis["inputs_with_placeholders"] = 0
         form_analysis["required_fields"] = 0
-        form_analysis["fieldsets"] = len(self.soup.find_all('fieldset'))
-        form_analysis["legends"] = len(self.soup.find_all('legend'))
+        form_analysis["fieldsets"] = self.index.count('fieldset')
+        form_analysis["legends"] = self.index.count('legend')
         
-        inputs = self.soup.find_all(['input', 'select', 'textarea'])
+        inputs = self.index.inputs
         form_analysis["total_inputs"] = len(inputs)
         
         for input_elem in inputs:
@@ -157,41 +197,44 @@ class AccessibilityAnalyzer:
             if input_elem.get('placeholder'):
                 form_analysis["inputs_with_placeholders"] += 1
             
-            # Sprawdzanie etykiet powiązanych z polami
+            # Pole ma etykietę, jeśli wskazuje je <label for> lub ma atrybut ARIA;
+            # pole z oboma rodzajami etykiet liczone jest raz
             input_id = input_elem.get('id')
-            if input_id:
-                label = self.soup.find('label', attrs={"for": input_id})
-                if label:
-                    form_analysis["inputs_with_labels"] += 1
-            
-            # Sprawdzanie atrybutów ARIA
-            if input_elem.get('aria-label') or input_elem.get('aria-labelledby'):
+            if ((input_id and input_id in self.index.label_for)
+                    or input_elem.get('aria-label') or input_elem.get('aria-labelledby')):
                 form_analysis["inputs_with_labels"] += 1
     
     def check_multimedia(self):
         """Analiza dostępności multimediów"""
         multimedia = self.accessibility["multimedia"]
         
-        videos = self.soup.find_all('video')
-        audios = self.soup.find_all('audio')
-        iframes = self.soup.find_all('iframe')
+        videos = self.index.tags('video')
+        audios = self.index.tags('audio')
+        iframes = self.index.tags('iframe')
+        
+        # controls i autoplay to atrybuty logiczne - liczy się ich obecność, nie wartość
+        with_captions = video_controls = video_autoplay = 0
+        for v in videos:
+            with_captions += v.find('track', kind='captions') is not None
+            video_controls += 'controls' in v.attrs
+            video_autoplay += 'autoplay' in v.attrs
         
         multimedia_analysis = {
             "videos": {
                 "total": len(videos),
-                "with_captions": len([v for v in videos if v.find('track', kind='captions')]),
-                "with_controls": len([v for v in videos if v.get('controls')]),
-                "autoplay": len([v for v in videos if v.get('autoplay')])
+                "with_captions": with_captions,
+                "with_controls": video_controls,
+                "autoplay": video_autoplay
             },
             "audios": {
                 "total": len(audios),
-                "with_controls": len([a for a in audios if a.get('controls')]),
-                "autoplay": len([a for a in audios if a.get('autoplay')])
+                "with_controls": sum(1 for a in audios if 'controls' in a.attrs),
+                "autoplay": sum(1 for a in audios if 'autoplay' in a.attrs)
             },
             "iframes": {
                 "total": len(iframes),
-                "with_title": len([i for i in iframes if i.get('title')]),
-                "with_aria_label": len([i for i in iframes if i.get('aria-label')])
+                "with_title": sum(1 for i in iframes if i.get('title')),
+                "with_aria_label": sum(1 for i in iframes if i.get('aria-label'))
             }
         }
         
@@ -202,16 +245,16 @@ class AccessibilityAnalyzer:
         text = self.accessibility["text_content"]
         
         text_analysis = {
-            "total_text_length": len(self.soup.get_text()),
-            "paragraphs": len(self.soup.find_all('p')),
+            "total_text_length": self.index.text_length,
+            "paragraphs": self.index.count('p'),
             "lists": {
-                "ul": len(self.soup.find_all('ul')),
-                "ol": len(self.soup.find_all('ol')),
-                "dl": len(self.soup.find_all('dl'))
+                "ul": self.index.count('ul'),
+                "ol": self.index.count('ol'),
+                "dl": self.index.count('dl')
             },
             "tables": self._analyze_tables(),
-            "abbreviations": len(self.soup.find_all('abbr')),
-            "quotes": len(self.soup.find_all(['q', 'blockquote']))
+            "abbreviations": self.index.count('abbr'),
+            "quotes": self.index.count('q', 'blockquote')
         }
         
         self.accessibility["text_content"] = text_analysis
@@ -220,35 +263,24 @@ class AccessibilityAnalyzer:
         """Sprawdza kontrast kolorów na stronie (uproszczona analiza)"""
         contrast = self.accessibility["color_contrast"]
         
-        # Pobierz wszystkie style inline i arkusze stylów
-        css_content = ""
-        for style in self.soup.find_all('style'):
-            css_content += style.get_text()
-        
-        # Analizuj kolory
-        colors = extract_css_colors(css_content)
+        # Analizuj kolory ze wszystkich znaczników <style>
+        colors = extract_css_colors(self.index.style_text)
         contrast_issues = []
         compliant_pairs = []
         
-        # Sprawdź kontrast dla każdej pary kolorów tła i tekstu
-        for bg_color in colors["background"]:
-            for text_color in colors["text"]:
-                try:
-                    contrast_ratio = calculate_contrast_ratio(bg_color, text_color)
-                    if contrast_ratio < 4.5:  # Minimalny współczynnik kontrastu dla AA
-                        contrast_issues.append({
-                            "background": bg_color,
-                            "text": text_color,
-                            "ratio": round(contrast_ratio, 2)
-                        })
-                    else:
-                        compliant_pairs.append({
-                            "background": bg_color,
-                            "text": text_color,
-                            "ratio": round(contrast_ratio, 2)
-                        })
-                except Exception:
-                    pass  # Błąd obliczania kontrastu dla pewnych formatów kolorów
+        # Kontrast dla wszystkich par kolorów tła i tekstu liczony jedną macierzą
+        bg_colors, text_colors, ratios = contrast_matrix(colors["background"], colors["text"])
+        for bg_color, row in zip(bg_colors, ratios):
+            for text_color, contrast_ratio in zip(text_colors, row):
+                pair = {
+                    "background": bg_color,
+                    "text": text_color,
+                    "ratio": round(contrast_ratio, 2)
+                }
+                if contrast_ratio < 4.5:  # Minimalny współczynnik kontrastu dla AA
+                    contrast_issues.append(pair)
+                else:
+                    compliant_pairs.append(pair)
         
         contrast["issues"] = contrast_issues[:10]  # Ograniczenie do 10 problemów
         contrast["compliant_pairs"] = compliant_pairs[:10]  # Ograniczenie do 10 par
@@ -259,100 +291,44 @@ class AccessibilityAnalyzer:
     def check_wcag_compliance(self):
         """Weryfikacja zgodności z WCAG 2.1"""
         wcag = self.accessibility["wcag_compliance"]
-        
-        # Poziom A - wymagania podstawowe
-        level_a_score = 0
-        level_a_total = 10
-        
-        # Identyfikacja języka
-        if self.accessibility["semantic_structure"]["lang_attribute"] != "Missing":
-            level_a_score += 1
-        
-        # Obrazy mają tekst alternatywny
-        images = self.accessibility["screen_reader"]["images"]
-        if images["without_alt"] == 0:
-            level_a_score += 1
-        
-        # Nagłówki i etykiety
-        if not self.accessibility["semantic_structure"]["heading_hierarchy_issues"]:
-            level_a_score += 1
-        
-        # Etykiety formularzy
+        sem = self.accessibility["semantic_structure"]
         forms = self.accessibility["forms"]
-        if forms["total_inputs"] > 0 and forms["inputs_with_labels"] == forms["total_inputs"]:
-            level_a_score += 1
-        
-        # Dodatkowe wcześniej obliczone punkty (uproszczenie)
-        level_a_score += 6
-        
-        wcag["level_a"] = {
-            "score": level_a_score,
-            "total": level_a_total,
-            "percentage": round((level_a_score / level_a_total) * 100, 1),
-            "passed": level_a_score >= level_a_total * 0.8
-        }
         
-        # Poziom AA - rozszerzone wymagania
-        level_aa_score = level_a_score  # AA zawiera A
-        level_aa_total = 15
-        
-        # Kontrast kolorów
-        if not self.accessibility["color_contrast"].get("has_issues", True):
-            level_aa_score += 1
-        
-        # Dostępność z klawiatury
-        if len(self.accessibility["keyboard_navigation"]["tabindex_issues"]) == 0:
-            level_aa_score += 1
-        
-        # Dodatkowe wcześniej obliczone punkty (uproszczenie)
-        level_aa_score += 2
-        
-        wcag["level_aa"] = {
-            "score": level_aa_score,
-            "total": level_aa_total,
-            "percentage": round((level_aa_score / level_aa_total) * 100, 1),
-            "passed": level_aa_score >= level_aa_total * 0.8
-        }
+        level_a_score, level_aa_score = wcag_scores(
+            sem["lang_attribute"] != "Missing",
+            self.accessibility["screen_reader"]["images"]["without_alt"] == 0,
+            not sem["heading_hierarchy_issues"],
+            forms["total_inputs"] > 0 and forms["inputs_with_labels"] == forms["total_inputs"],
+            not self.accessibility["color_contrast"].get("has_issues", True),
+            len(self.accessibility["keyboard_navigation"]["tabindex_issues"]) == 0,
+        )
+        wcag["level_a"] = _wcag_level(level_a_score, WCAG_LEVEL_A_TOTAL)
+        wcag["level_aa"] = _wcag_level(level_aa_score, WCAG_LEVEL_AA_TOTAL)
     
     # Metody pomocnicze
     def _check_skip_links(self):
         """Sprawdza linki pomijające nawigację"""
-        skip_patterns = [
-            r'skip.*nav',
-            r'skip.*content',
-            r'skip.*main',
-            r'pomiń.*nav',
-            r'pomiń.*treść',
-            r'przeskocz.*treść'
-        ]
-        
-        links = self.soup.find_all('a', href=True)
         skip_links = []
         
-        for link in links:
+        for link in self.index.links:
+            href = link.get('href')
+            if href is None:
+                continue
             text = link.get_text().lower().strip()
-            href = link.get('href', '').lower()
-            
-            for pattern in skip_patterns:
-                if re.search(pattern, text, re.I) or re.search(pattern, href, re.I):
-                    skip_links.append(text)
-                    break
+            if _SKIP_RE.search(text) or _SKIP_RE.search(href):
+                skip_links.append(text)
         
         return skip_links
     
     def _check_focus_indicators(self):
         """Sprawdza wskaźniki fokusa w CSS"""
         # Uproszczona analiza
-        css_content = ""
-        for style in self.soup.find_all('style'):
-            css_content += style.get_text()
-        
-        focus_indicators = len(re.findall(r':focus', css_content, re.I))
+        focus_indicators = len(_FOCUS_RE.findall(self.index.style_text))
         return focus_indicators
     
     def _analyze_tables(self):
         """Analiza dostępności tabel"""
-        tables = self.soup.find_all('table')
+        tables = self.index.tags('table')
         table_analysis = {
             "total": len(tables),
             "with_headers": 0,
@@ -4,16 +4,40 @@
 import re
 from collections import Counter
 import socket
+from functools import cached_property
 from urllib.parse import urlparse
 from ..utils.helpers import check_dns_lookup_time, has_responsive_meta_tag
+from ..utils.soup_index import HEADING_TAGS, HTML5_LANDMARKS, SoupIndex
+
+# Wzorce kompilowane raz przy imporcie modułu
+_TAG_RE = re.compile(r'<(/?)(\w+)')  # znaczniki otwierające i zamykające w surowym źródle
+_EXTERNAL_URL_RE = re.compile(r'https?://')
+_MOBILE_INPUT_RE = re.compile(r'tel|email|number|date|datetime-local|month|search|time|url|week')
+_MEDIA_RE = re.compile(r'@media')
+_JQUERY_RE = re.compile(r'jquery', re.I)
+
+# Elementy puste (bez znacznika zamykającego) według specyfikacji HTML
+_VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+})
+# Elementy, których znacznik zamykający można w HTML pominąć
+_OPTIONAL_END_TAGS = frozenset({
+    'html', 'head', 'body', 'li', 'dt', 'dd', 'p', 'rt', 'rp', 'optgroup', 'option',
+    'colgroup', 'caption', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th'
+})
+_UNCHECKED_TAGS = _VOID_TAGS | _OPTIONAL_END_TAGS
 
 class PerformanceAnalyzer:
     """
     Analizator wydajności stron internetowych.
     Analizuje czasy ładowania, zasoby, optymalizację i inne aspekty wpływające na wydajność.
+    Oczekuje dokumentu przetworzonego parserem lxml (BeautifulSoup(html, 'lxml')),
+    tak jak robi to WebsiteAnalyzer.get_website.
     """
-    def __init__(self, soup, response, url, results):
+    def __init__(self, soup, response, url, results, index=None):
         self.soup = soup
+        self.index = index if index is not None else SoupIndex.from_soup(soup)
         self.response = response
         self.url = url
         self.results = results
@@ -34,11 +58,13 @@ class PerformanceAnalyzer:
         # Kod odpowiedzi HTTP
         loading["status_code"] = self.response.status_code
         
-        # Rozmiar odpowiedzi
-        response_size = len(self.response.content)
-        loading["response_size_bytes"] = response_size
-        loading["response_size_kb"] = round(response_size / 1024, 2)
-        loading["response_size_mb"] = round(response_size / (1024 * 1024), 3)
+        # Rozmiar odpowiedzi zapisuje już WebsiteAnalyzer.get_website (po obcięciu do limitu);
+        # liczony tutaj tylko przy samodzielnym użyciu analizatora
+        if "response_size_bytes" not in loading:
+            response_size = len(self.response.content)
+            loading["response_size_bytes"] = response_size
+            loading["response_size_kb"] = round(response_size / 1024, 2)
+            loading["response_size_mb"] = round(response_size / (1024 * 1024), 3)
         
         # Czas wyszukiwania DNS
         try:
@@ -58,10 +84,10 @@ class PerformanceAnalyzer:
         resources = self.performance["resources"]
         
         # Zliczanie zasobów
-        images = self.soup.find_all('img')
-        css_links = self.soup.find_all('link', rel='stylesheet')
-        js_scripts = self.soup.find_all('script', src=True)
-        external_links = self.soup.find_all('a', href=re.compile(r'^https?://'))
+        images = self.index.imgs
+        css_links = self.index.stylesheet_links
+        js_scripts = self.index.external_scripts
+        external_links = [a for a in self.index.links if _EXTERNAL_URL_RE.match(a.get('href', ''))]
         
         resources["total_images"] = len(images)
         resources["total_css_files"] = len(css_links)
@@ -77,12 +103,15 @@ class PerformanceAnalyzer:
         for img in images:
             src = img.get('src', '')
             if src:
-                # Sprawdzanie formatu obrazu
-                if '.' in src:
-                    ext = src.split('.')[-1].lower().split('?')[0]
+                # Sprawdzanie formatu obrazu (rozszerzenie przed parametrami zapytania)
+                end = src.find('?')
+                if end < 0:
+                    end = len(src)
+                dot = src.rfind('.', 0, end)
+                if dot >= 0:
+                    ext = src[dot + 1:end].lower()
                     images_formats[ext] += 1
-                    if ext == 'webp':
-                        webp_images += 1
+                    webp_images += ext == 'webp'
                 
                 # Sprawdzanie, czy wymiary są określone
                 if not (img.get('width') or img.get('height')):
@@ -106,27 +135,27 @@ class PerformanceAnalyzer:
         
         for css in css_links:
             href = css.get('href', '')
-            if href and not href.startswith('/') and ('://' in href):
+            if href and not href.startswith('/') and '://' in href:
                 css_external += 1
         
         for js in js_scripts:
             src = js.get('src', '')
-            if src and not src.startswith('/') and ('://' in src):
+            if src and not src.startswith('/') and '://' in src:
                 js_external += 1
         
         resources["external_css"] = css_external
         resources["external_js"] = js_external
         resources["internal_css"] = len(css_links) - css_external
         resources["internal_js"] = len(js_scripts) - js_external
-        resources["inline_styles"] = len(self.soup.find_all(style=True))
-        resources["inline_scripts"] = len(self.soup.find_all('script', src=False))
+        resources["inline_styles"] = self.index.attr_counts['style']
+        resources["inline_scripts"] = len(self.index.inline_scripts)
     
     def analyze_seo(self):
         """Analizuje elementy SEO"""
         seo = self.performance["seo"]
         
         # Podstawowe meta tagi
-        title = self.soup.find('title')
+        title = self.index.first('title')
         meta_description = self.soup.find('meta', attrs={'name': 'description'})
         meta_keywords = self.soup.find('meta', attrs={'name': 'keywords'})
         meta_viewport = self.soup.find('meta', attrs={'name': 'viewport'})
@@ -178,27 +207,28 @@ class PerformanceAnalyzer:
         
         seo["url_analysis"] = {
             "length": len(self.url),
-            "path_segments": len([s for s in path.split('/') if s]),
+            "path_segments": sum(1 for s in path.split('/') if s),
             "query_params": len(parsed_url.query.split('&')) if parsed_url.query else 0,
             "has_hash": bool(parsed_url.fragment),
             "uses_https": parsed_url.scheme == "https"
         }
         
-        # Analiza nagłówków strony w kontekście SEO
-        headings = []
-        for i in range(1, 7):
-            h_tags = self.soup.find_all(f'h{i}')
-            for tag in h_tags:
-                headings.append({
+        # Analiza nagłówków strony w kontekście SEO; liczniki pochodzą z indeksu,
+        # a słowniki z tekstem budowane są tylko dla próbek
+        samples = []
+        for i, name in enumerate(HEADING_TAGS, 1):
+            for tag in self.index.tags(name)[:5 - len(samples)]:  # Pierwsze 5 nagłówków
+                text = tag.get_text().strip()
+                samples.append({
                     "level": i,
-                    "text": tag.get_text().strip()[:100],
-                    "length": len(tag.get_text().strip())
+                    "text": text[:100],
+                    "length": len(text)
                 })
         
         seo["headings_analysis"] = {
-            "total": len(headings),
-            "h1_count": len([h for h in headings if h["level"] == 1]),
-            "samples": headings[:5]  # Pierwsze 5 nagłówków
+            "total": self.index.count(*HEADING_TAGS),
+            "h1_count": self.index.count('h1'),
+            "samples": samples
         }
     
     def analyze_mobile_optimization(self):
@@ -210,17 +240,13 @@ class PerformanceAnalyzer:
         mobile["css_media_queries"] = self._count_media_queries()
         
         # Badanie używania flexboxa lub grida
-        styles_content = ""
-        for style in self.soup.find_all('style'):
-            styles_content += style.get_text()
+        styles_content = self.index.style_text
         
         mobile["uses_flexbox"] = "display: flex" in styles_content or "display:flex" in styles_content
         mobile["uses_grid"] = "display: grid" in styles_content or "display:grid" in styles_content
         
         # Analiza elementów input z typem dla mobile
-        mobile_inputs = len(self.soup.find_all('input', attrs={
-            'type': re.compile(r'tel|email|number|date|datetime-local|month|search|time|url|week')
-        }))
+        mobile_inputs = sum(1 for i in self.index.tags('input') if _MOBILE_INPUT_RE.search(i.get('type', '')))
         mobile["mobile_input_types"] = mobile_inputs
     
     def analyze_technical_aspects(self):
@@ -233,34 +259,36 @@ class PerformanceAnalyzer:
         
         # Liczba błędów HTML (uproszczona analiza)
         tech["html_validation_errors"] = self._check_html_validation()
-        tech["total_dom_elements"] = len(self.soup.find_all())
-        tech["inline_styles"] = len(self.soup.find_all(style=True))
-        tech["inline_scripts"] = len(self.soup.find_all('script', src=False))
+        tech["total_dom_elements"] = len(self.index.elements)
+        tech["inline_styles"] = self.index.attr_counts['style']
+        tech["inline_scripts"] = len(self.index.inline_scripts)
         
         # Analiza znaczników strukturalnych
-        tech["html5_semantic_elements"] = len(self.soup.find_all(['header', 'nav', 'main', 'article', 'section', 'aside', 'footer']))
+        tech["html5_semantic_elements"] = self.index.count(*HTML5_LANDMARKS)
         
         # Analiza atrybutów lang i dir
-        html_tag = self.soup.find('html')
+        html_tag = self.index.first('html')
         tech["lang_attribute"] = html_tag.get('lang', 'Missing') if html_tag else "Missing"
         tech["dir_attribute"] = html_tag.get('dir', 'Not specified') if html_tag else "Not specified"
         
         # Sprawdzanie, czy strona używa JQuery
-        jquery_scripts = len(self.soup.find_all('script', src=re.compile(r'jquery', re.I)))
-        tech["uses_jquery"] = jquery_scripts > 0 or "jQuery" in self.response.text or "$(" in self.response.text
+        jquery_scripts = sum(1 for script in self.index.scripts if _JQUERY_RE.search(script.get('src', '')))
+        text = self.response_text
+        tech["uses_jquery"] = jquery_scripts > 0 or "jQuery" in text or "$(" in text
+    
+    @cached_property
+    def response_text(self):
+        """
+        Zdekodowana treść odpowiedzi. requests dekoduje (i przy braku kodowania
+        wykrywa je) przy każdym odczycie response.text, dlatego robimy to raz.
+        """
+        return self.response.text
     
     # Metody pomocnicze
     def _count_media_queries(self):
         """Zlicza zapytania o media w stylach strony"""
-        count = 0
-        for style in self.soup.find_all('style'):
-            count += len(re.findall(r'@media', style.get_text()))
-        
-        for link in self.soup.find_all('link', rel='stylesheet'):
-            media = link.get('media')
-            if media and media != 'all':
-                count += 1
-        
+        count = len(_MEDIA_RE.findall(self.index.style_text))
+        count += sum(1 for link in self.index.stylesheet_links if link.get('media', 'all') not in ('', 'all'))
         return count
     
     def _check_html_validation(self):
@@ -268,23 +296,19 @@ class PerformanceAnalyzer:
         errors = 0
         
         # Sprawdzenie podstawowych problemów
-        if not self.soup.find('html'):
-            errors += 1
-        if not self.soup.find('head'):
-            errors += 1
-        if not self.soup.find('body'):
-            errors += 1
-        if not self.soup.find('title'):
-            errors += 1
-        
-        # Sprawdzenie niezamkniętych tagów (uproszczone)
-        html_content = str(self.soup)
-        open_tags = re.findall(r'<(\w+)', html_content)
-        close_tags = re.findall(r'</(\w+)>', html_content)
-        
-        for tag in set(open_tags):
-            if tag.lower() not in ['img', 'br', 'hr', 'input', 'meta', 'link']:
-                if open_tags.count(tag) != close_tags.count(tag):
-                    errors += 1
+        for name in ('html', 'head', 'body', 'title'):
+            if not self.index.first(name):
+                errors += 1
+        
+        # Sprawdzenie niezamkniętych tagów (uproszczone) w surowym źródle odpowiedzi;
+        # drzewo BeautifulSoup po serializacji ma zawsze domknięte znaczniki
+        open_counts = Counter()
+        close_counts = Counter()
+        for closing, tag in _TAG_RE.findall(self.response_text):
+            # Nazwy znaczników w HTML nie rozróżniają wielkości liter
+            (close_counts if closing else open_counts)[tag.lower()] += 1
+        
+        errors += sum(1 for tag, count in open_counts.items()
+                      if tag not in _UNCHECKED_TAGS and count != close_counts[tag])
         
         return errors
\ No newline at end of file
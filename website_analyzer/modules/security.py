@@ -4,16 +4,104 @@
 import re
 import socket
 import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
+from ..utils.soup_index import SoupIndex
+
+# Atrybuty z adresem zasobu sprawdzane pod kątem mieszanej zawartości
+MIXED_CONTENT_ATTRS = {
+    'img': 'src',
+    'script': 'src',
+    'link': 'href',
+    'iframe': 'src',
+    'object': 'data',
+    'source': 'src',
+    'audio': 'src',
+    'video': 'src'
+}
+
+# Czas (w sekundach), przez jaki pobrany certyfikat hosta jest używany ponownie
+SSL_CACHE_TTL = 300
+SSL_CACHE_MAXSIZE = 1024
+
+# Limity czasu (w sekundach) na nawiązanie połączenia TCP i na sam handshake TLS
+SSL_CONNECT_TIMEOUT = 3
+SSL_HANDSHAKE_TIMEOUT = 5
+
+_ssl_cache = {}
+
+_CERT_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+}
+
+def _parse_cert_time(value):
+    """Zamienia datę z certyfikatu w stałym formacie 'Jan  1 12:00:00 2030 GMT' na datetime"""
+    month, day, clock, year = value.split()[:4]
+    hour, minute, second = clock.split(':')
+    return datetime(int(year), _CERT_MONTHS[month], int(day), int(hour), int(minute), int(second))
+
+def _fetch_peer_cert(hostname, connect_timeout=SSL_CONNECT_TIMEOUT, handshake_timeout=SSL_HANDSHAKE_TIMEOUT):
+    """
+    Pobiera certyfikat i wersję protokołu TLS hosta, z pamięcią podręczną na SSL_CACHE_TTL sekund
+    
+    Returns:
+        tuple: (certyfikat jako dict z getpeercert(), wersja protokołu)
+    """
+    now = time.monotonic()
+    cached = _ssl_cache.get(hostname)
+    if cached is not None and now - cached[0] < SSL_CACHE_TTL:
+        return cached[1], cached[2]
+    
+    context = ssl.create_default_context()
+    with socket.create_connection((hostname, 443), timeout=connect_timeout) as sock:
+        sock.settimeout(handshake_timeout)
+        with context.wrap_socket(sock, server_hostname=hostname) as ssock:
+            cert = ssock.getpeercert()
+            protocol_version = ssock.version()
+    
+    if len(_ssl_cache) >= SSL_CACHE_MAXSIZE:
+        _ssl_cache.clear()
+    _ssl_cache[hostname] = (now, cert, protocol_version)
+    return cert, protocol_version
+
+# Odliczenia od wyniku bezpieczeństwa: (opis, punkty za każde wystąpienie, maksymalne odliczenie),
+# w kolejności liczników z calculate_security_score
+SCORE_DEDUCTIONS = (
+    ("Missing security headers", 10, 40),
+    ("No HTTPS", 50, 50),
+    ("SSL issues", 10, 30),
+    ("Potential XSS vectors", 5, 25),
+    ("Mixed content", 3, 15),
+    ("Insecure forms", 10, 30)
+)
+
+# Progi oceny słownej (od najwyższego)
+SCORE_RATINGS = (
+    (90, "Excellent"),
+    (75, "Good"),
+    (50, "Fair"),
+    (25, "Poor"),
+    (float('-inf'), "Very Poor")
+)
+
+# Atrybuty zdarzeń, które mogą zawierać JavaScript
+RISKY_ATTRS = ('onclick', 'onload', 'onmouseover', 'onerror', 'onkeyup', 'onsubmit')
+
+_URL_HTTP_RE = re.compile(r'url\(\s*[\'"]?(http://[^\'")]+)[\'"]?\s*\)', re.I)
+_JS_HREF_RE = re.compile(r'^javascript:', re.I)
+_CSRF_RE = re.compile(r'csrf|token|_token|xsrf', re.I)
 
 class SecurityAnalyzer:
     """
     Analizator bezpieczeństwa stron internetowych.
     Sprawdza nagłówki bezpieczeństwa, konfigurację SSL/TLS, podatności XSS i inne aspekty bezpieczeństwa.
     """
-    def __init__(self, soup, response, url, results):
+    def __init__(self, soup, response, url, results, index=None):
         self.soup = soup
+        self.index = index if index is not None else SoupIndex.from_soup(soup)
         self.response = response
         self.url = url
         self.results = results
@@ -23,8 +111,11 @@ class SecurityAnalyzer:
     def analyze(self):
         """Uruchamia wszystkie analizy bezpieczeństwa"""
         self.check_security_headers()
-        self.check_ssl_tls()
-        self.check_content_security()
+        # Połączenie TLS czeka na sieć, więc w tym czasie analizowana jest treść strony
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ssl_probe = executor.submit(self.check_ssl_tls)
+            self.check_content_security()
+            ssl_probe.result()
         self.check_mixed_content()
         self.check_form_security()
         self.calculate_security_score()
@@ -62,40 +153,36 @@ class SecurityAnalyzer:
         
         try:
             hostname = parsed_url.netloc
-            context = ssl.create_default_context()
+            cert, protocol_version = _fetch_peer_cert(hostname)
+            
+            # Dane certyfikatu
+            cert_info = {
+                'subject': dict(x[0] for x in cert['subject']),
+                'issuer': dict(x[0] for x in cert['issuer']),
+                'version': cert['version'],
+                'serial_number': cert['serialNumber'],
+                'not_before': cert['notBefore'],
+                'not_after': cert['notAfter']
+            }
+            
+            # Czas ważności liczony zawsze względem bieżącej chwili, także dla certyfikatu z pamięci podręcznej
+            cert_expiry = _parse_cert_time(cert['notAfter'])
+            days_to_expiry = (cert_expiry - datetime.now()).days
+            
+            self.security["ssl_certificate"] = cert_info
+            self.security["ssl_days_to_expiry"] = days_to_expiry
+            self.security["ssl_expires_soon"] = days_to_expiry < 30
+            
+            # Wersja protokołu
+            self.security["ssl_protocol_version"] = protocol_version
+            
+            # Lista problemów
+            ssl_issues = []
+            if days_to_expiry < 30:
+                ssl_issues.append(f"Certificate expires soon ({days_to_expiry} days)")
+            
+            self.security["ssl_issues"] = ssl_issues
             
-            with socket.create_connection((hostname, 443), timeout=10) as sock:
-                with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                    cert = ssock.getpeercert()
-                    
-                    # Dane certyfikatu
-                    cert_info = {
-                        'subject': dict(x[0] for x in cert['subject']),
-                        'issuer': dict(x[0] for x in cert['issuer']),
-                        'version': cert['version'],
-                        'serial_number': cert['serialNumber'],
-                        'not_before': cert['notBefore'],
-                        'not_after': cert['notAfter']
-                    }
-                    
-                    # Czas ważności
-                    cert_expiry = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                    days_to_expiry = (cert_expiry - datetime.now()).days
-                    
-                    self.security["ssl_certificate"] = cert_info
-                    self.security["ssl_days_to_expiry"] = days_to_expiry
-                    self.security["ssl_expires_soon"] = days_to_expiry < 30
-                    
-                    # Wersja protokołu
-                    self.security["ssl_protocol_version"] = ssock.version()
-                    
-                    # Lista problemów
-                    ssl_issues = []
-                    if days_to_expiry < 30:
-                        ssl_issues.append(f"Certificate expires soon ({days_to_expiry} days)")
-                    
-                    self.security["ssl_issues"] = ssl_issues
-                    
         except Exception as e:
             self.security["ssl_error"] = str(e)
             self.security["ssl_issues"] = ["Error analyzing SSL: " + str(e)]
@@ -103,9 +190,10 @@ class SecurityAnalyzer:
     def check_content_security(self):
         """Analizuje zabezpieczenia treści"""
         # Wykrywanie inline JavaScript
-        inline_scripts = self.soup.find_all('script', src=False)
+        inline_scripts = self.index.inline_scripts
         has_unsafe_inline = any(
-            'javascript:' in str(script) 
+            'javascript:' in script.string or
+            any('javascript:' in value for value in script.attrs.values() if isinstance(value, str))
             for script in inline_scripts 
             if script.string
         )
@@ -114,10 +202,16 @@ class SecurityAnalyzer:
         potential_xss_vectors = []
         
         # Sprawdzanie atrybutów, które mogą zawierać JavaScript
-        risky_attrs = ['onclick', 'onload', 'onmouseover', 'onerror', 'onkeyup', 'onsubmit']
-        for attr in risky_attrs:
-            elements = self.soup.find_all(attrs={attr: True})
-            for element in elements[:5]:  # Ograniczenie do 5 dla każdego atrybutu
+        # Jedno przejście po elementach, tylko dla atrybutów faktycznie obecnych w dokumencie
+        risky_elements = {attr: [] for attr in RISKY_ATTRS if self.index.attr_counts[attr]}
+        if risky_elements:
+            for element in self.index.elements:
+                for attr, elements in risky_elements.items():
+                    if attr in element.attrs and len(elements) < 5:  # Ograniczenie do 5 dla każdego atrybutu
+                        elements.append(element)
+        
+        for attr, elements in risky_elements.items():
+            for element in elements:
                 potential_xss_vectors.append({
                     'element': element.name,
                     'attribute': attr,
@@ -125,7 +219,7 @@ class SecurityAnalyzer:
                 })
         
         # Sprawdzanie href z javascript:
-        js_links = self.soup.find_all('a', href=re.compile(r'^javascript:', re.I))
+        js_links = [link for link in self.index.links if _JS_HREF_RE.search(link.attrs.get('href', ''))]
         for link in js_links[:5]:
             potential_xss_vectors.append({
                 'element': 'a',
@@ -147,29 +241,26 @@ class SecurityAnalyzer:
         mixed_content = []
         
         # Sprawdzanie odwołań do zawartości HTTP
-        for tag_name, attr_name in [
-            ('img', 'src'), 
-            ('script', 'src'), 
-            ('link', 'href'),
-            ('iframe', 'src'),
-            ('object', 'data'),
-            ('source', 'src'),
-            ('audio', 'src'),
-            ('video', 'src')
-        ]:
-            elements = self.soup.find_all(tag_name, attrs={attr_name: re.compile(r'^http://', re.I)})
-            for element in elements[:3]:  # Limit do 3 przykładów dla każdego typu
+        for tag_name, attr_name in MIXED_CONTENT_ATTRS.items():
+            found = 0
+            for element in self.index.tags(tag_name):
+                url = element.attrs.get(attr_name)
+                if not url or url[:7].lower() != 'http://':
+                    continue
                 mixed_content.append({
                     'tag': tag_name,
                     'attribute': attr_name,
-                    'url': element[attr_name][:100]
+                    'url': url[:100]
                 })
+                found += 1
+                if found == 3:  # Limit do 3 przykładów dla każdego typu
+                    break
         
         # Sprawdzanie stylów z url() odwołującymi się do HTTP
-        style_tags = self.soup.find_all('style')
+        style_tags = self.index.styles
         for style in style_tags:
             if style.string:
-                urls = re.findall(r'url\(\s*[\'"]?(http://[^\'")]+)[\'"]?\s*\)', style.string, re.I)
+                urls = _URL_HTTP_RE.findall(style.string)
                 for url in urls[:3]:
                     mixed_content.append({
                         'tag': 'style',
@@ -185,7 +276,7 @@ class SecurityAnalyzer:
     
     def check_form_security(self):
         """Analizuje bezpieczeństwo formularzy"""
-        forms = self.soup.find_all('form')
+        forms = self.index.forms
         form_security = {
             "total": len(forms),
             "with_csrf_protection": 0,
@@ -199,7 +290,7 @@ class SecurityAnalyzer:
             issues = []
             
             # Sprawdzanie, czy akcja formularza używa HTTPS
-            action = form.get('action', '')
+            action = form.attrs.get('action', '')
             if action and action.startswith('http:'):
                 is_secure = False
                 issues.append("Form submits to HTTP URL")
@@ -214,7 +305,7 @@ class SecurityAnalyzer:
             # 1. Sprawdzanie ukrytego pola z typowymi nazwami tokenów CSRF
             csrf_fields = form.find_all('input', attrs={
                 'type': 'hidden', 
-                'name': re.compile(r'csrf|token|_token|xsrf', re.I)
+                'name': _CSRF_RE
             })
             if csrf_fields:
                 has_csrf = True
@@ -250,63 +341,28 @@ class SecurityAnalyzer:
     
     def calculate_security_score(self):
         """Oblicza wynik bezpieczeństwa"""
+        security = self.security
+        counts = (
+            security.get("missing_security_headers", 0),
+            not security.get("https_enabled", False),
+            len(security.get("ssl_issues", [])),
+            len(security.get("potential_xss_vectors", [])),
+            security.get("mixed_content", {}).get("count", 0),
+            len(security.get("forms", {}).get("insecure_forms", []))
+        )
+        
         score = 100
         deductions = []
-        
-        # Redukcja za brakujące nagłówki bezpieczeństwa
-        missing_headers = self.security.get("missing_security_headers", 0)
-        if missing_headers > 0:
-            header_deduction = min(missing_headers * 10, 40)  # Maksymalnie 40 punktów odjęcia za nagłówki
-            score -= header_deduction
-            deductions.append(f"Missing security headers: -{header_deduction}")
-        
-        # Redukcja za problemy z SSL
-        if not self.security.get("https_enabled", False):
-            score -= 50
-            deductions.append("No HTTPS: -50")
-        
-        ssl_issues = self.security.get("ssl_issues", [])
-        if ssl_issues:
-            ssl_deduction = min(len(ssl_issues) * 10, 30)
-            score -= ssl_deduction
-            deductions.append(f"SSL issues: -{ssl_deduction}")
-        
-        # Redukcja za potencjalne wektory XSS
-        xss_vectors = len(self.security.get("potential_xss_vectors", []))
-        if xss_vectors > 0:
-            xss_deduction = min(xss_vectors * 5, 25)
-            score -= xss_deduction
-            deductions.append(f"Potential XSS vectors: -{xss_deduction}")
-        
-        # Redukcja za mieszaną zawartość
-        mixed_content_count = self.security.get("mixed_content", {}).get("count", 0)
-        if mixed_content_count > 0:
-            mixed_deduction = min(mixed_content_count * 3, 15)
-            score -= mixed_deduction
-            deductions.append(f"Mixed content: -{mixed_deduction}")
-        
-        # Redukcja za niezabezpieczone formularze
-        insecure_forms = len(self.security.get("forms", {}).get("insecure_forms", []))
-        if insecure_forms > 0:
-            form_deduction = min(insecure_forms * 10, 30)
-            score -= form_deduction
-            deductions.append(f"Insecure forms: -{form_deduction}")
+        for count, (label, weight, cap) in zip(counts, SCORE_DEDUCTIONS):
+            if count:
+                deduction = min(count * weight, cap)
+                score -= deduction
+                deductions.append(f"{label}: -{deduction}")
         
         # Zapisanie wyniku
-        self.security["score"] = max(0, score)
-        self.security["max_score"] = 100
-        self.security["deductions"] = deductions
+        security["score"] = max(0, score)
+        security["max_score"] = 100
+        security["deductions"] = deductions
         
         # Ocena słowna
-        if score >= 90:
-            rating = "Excellent"
-        elif score >= 75:
-            rating = "Good"
-        elif score >= 50:
-            rating = "Fair"
-        elif score >= 25:
-            rating = "Poor"
-        else:
-            rating = "Very Poor"
-        
-        self.security["rating"] = rating
\ No newline at end of file
+        security["rating"] = next(rating for threshold, rating in SCORE_RATINGS if score >= threshold)
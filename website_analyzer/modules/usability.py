@@ -2,15 +2,41 @@
 # -*- coding: utf-8 -*-
 
 import re
+from functools import lru_cache
 from urllib.parse import urlparse
+from ..utils.soup_index import SoupIndex
+
+# Wzorce klas elementów nawigacyjnych, kompilowane raz przy imporcie modułu
+_MENU_RE = re.compile(r'menu|navigation', re.I)
+_BREADCRUMB_RE = re.compile(r'breadcrumb', re.I)
+_SEARCH_RE = re.compile(r'search', re.I)
+_SOCIAL_RE = re.compile(r'facebook|twitter|instagram|linkedin|youtube')
+_CONTEXTUAL_LINK_RE = re.compile(r'read more|more info|dowiedz|więcej|czytaj')
+_CTA_CLASS_RE = re.compile(r'cta|button|btn', re.I)
+_TOUCH_CLASS_RE = re.compile(r'btn|button', re.I)
+_MOBILE_INPUT_RE = re.compile(r'tel|email|number|date|datetime-local|month|search|time|url|week')
+_SENTENCE_END_RE = re.compile(r'[.!?](?:\s|$)')
+
+@lru_cache(maxsize=4096)
+def _is_social_domain(domain):
+    """Sprawdza, czy domena należy do serwisu społecznościowego (wynik zapamiętywany per domena)"""
+    return _SOCIAL_RE.search(domain) is not None
+
+def _class_names(element):
+    """Zwraca klasy elementu jako jeden napis (pusty, gdy element nie ma klas)"""
+    classes = element.attrs.get('class')
+    if not classes:
+        return ''
+    return " ".join(classes) if isinstance(classes, list) else classes
 
 class UsabilityAnalyzer:
     """
     Analizator użyteczności stron internetowych.
     Sprawdza elementy związane z nawigacją, czytelnością i ogólną użytecznością strony.
     """
-    def __init__(self, soup, results):
+    def __init__(self, soup, results, index=None):
         self.soup = soup
+        self.index = index if index is not None else SoupIndex.from_soup(soup)
         self.results = results
         self.usability = {}
         self.results["usability"] = self.usability
@@ -26,36 +52,39 @@ class UsabilityAnalyzer:
         """Analizuje elementy nawigacyjne strony"""
         nav = {}
         
-        # Sprawdzanie elementów nawigacyjnych
-        nav_elements = self.soup.find_all('nav')
-        menu_elements = self.soup.find_all(class_=re.compile(r'menu|navigation', re.I))
-        breadcrumbs = self.soup.find_all(class_=re.compile(r'breadcrumb', re.I))
+        # Elementy menu, okruszki i wyszukiwarka zbierane w jednym przejściu po elementach
+        menu_elements = 0
+        breadcrumbs = 0
+        search_elements = 0
+        for el in self.index.elements:
+            class_names = _class_names(el)
+            if class_names:
+                menu_elements += _MENU_RE.search(class_names) is not None
+                breadcrumbs += _BREADCRUMB_RE.search(class_names) is not None
+                search_elements += _SEARCH_RE.search(class_names) is not None
         
         # Sprawdzanie funkcjonalności wyszukiwania
-        search_inputs = self.soup.find_all('input', attrs={'type': 'search'})
-        search_forms = self.soup.find_all('form', attrs={
-            'action': re.compile(r'search', re.I)
-        })
-        search_elements = self.soup.find_all(class_=re.compile(r'search', re.I))
-        
-        nav["nav_elements"] = len(nav_elements)
-        nav["menu_elements"] = len(menu_elements)
-        nav["breadcrumbs"] = len(breadcrumbs)
+        search_inputs = sum(1 for i in self.index.tags('input') if i.attrs.get('type') == 'search')
+        search_forms = sum(1 for f in self.index.forms if _SEARCH_RE.search(f.attrs.get('action', '')))
+        
+        nav["nav_elements"] = self.index.count('nav')
+        nav["menu_elements"] = menu_elements
+        nav["breadcrumbs"] = breadcrumbs
         nav["search_functionality"] = (
-            len(search_inputs) > 0 or
-            len(search_forms) > 0 or
-            len(search_elements) > 0
+            search_inputs > 0 or
+            search_forms > 0 or
+            search_elements > 0
         )
         
         # Analiza linków
-        links = self.soup.find_all('a', href=True)
+        links = [a for a in self.index.links if 'href' in a.attrs]
         internal_links = []
         external_links = []
         social_links = []
         broken_links = []
         
         for link in links:
-            href = link.get('href', '')
+            href = link.attrs['href']
             
             # Pomijanie pustych linków i kotwic
             if not href or href.startswith('#'):
@@ -67,7 +96,7 @@ class UsabilityAnalyzer:
                 domain = parsed.netloc.lower()
                 
                 # Sprawdzenie linków społecznościowych
-                if any(social in domain for social in ['facebook', 'twitter', 'instagram', 'linkedin', 'youtube']):
+                if _is_social_domain(domain):
                     social_links.append(href)
                 else:
                     external_links.append(href)
@@ -104,7 +133,7 @@ class UsabilityAnalyzer:
         content = {}
         
         # Analiza długości tekstów
-        paragraphs = self.soup.find_all('p')
+        paragraphs = self.index.tags('p')
         paragraph_lengths = [len(p.get_text().strip()) for p in paragraphs]
         avg_paragraph_length = sum(paragraph_lengths) / max(len(paragraph_lengths), 1)
         
@@ -113,36 +142,38 @@ class UsabilityAnalyzer:
         content["very_long_paragraphs"] = sum(1 for l in paragraph_lengths if l > 500)
         
         # Analiza elementów listy
-        lists = self.soup.find_all(['ul', 'ol'])
+        lists = self.index.tags('ul', 'ol')
         content["number_of_lists"] = len(lists)
         
         # Analiza obrazów dla ilustracji treści
-        images = self.soup.find_all('img')
+        images = self.index.imgs
         content["total_images"] = len(images)
-        content["images_with_alt"] = len([img for img in images if img.get('alt')])
+        content["images_with_alt"] = sum(1 for img in images if img.attrs.get('alt'))
         
         # Wykrywanie elementów wyróżniających treść
-        content["blockquotes"] = len(self.soup.find_all('blockquote'))
-        content["highlighted_content"] = len(self.soup.find_all(['strong', 'em', 'b', 'i', 'mark']))
+        content["blockquotes"] = self.index.count('blockquote')
+        content["highlighted_content"] = self.index.count('strong', 'em', 'b', 'i', 'mark')
         
         # Analiza tabel
-        tables = self.soup.find_all('table')
+        tables = self.index.tags('table')
         content["tables"] = len(tables)
-        content["tables_with_caption"] = len([t for t in tables if t.find('caption')])
+        content["tables_with_caption"] = sum(1 for t in tables if t.find('caption') is not None)
         
         # Analiza linków kontekstowych ("dowiedz się więcej", "czytaj dalej")
         contextual_links = []
-        for link in self.soup.find_all('a', href=True):
+        for link in self.index.links:
+            if 'href' not in link.attrs:
+                continue
             text = link.get_text().lower().strip()
-            if any(pattern in text for pattern in ['read more', 'more info', 'dowiedz', 'więcej', 'czytaj']):
+            if _CONTEXTUAL_LINK_RE.search(text):
                 contextual_links.append(link)
         
         content["contextual_links"] = len(contextual_links)
         
         # Wykrywanie elementów Call-to-Action
         cta_elements = []
-        cta_links = self.soup.find_all('a', class_=re.compile(r'cta|button|btn', re.I))
-        cta_buttons = self.soup.find_all('button')
+        cta_links = [a for a in self.index.links if _CTA_CLASS_RE.search(_class_names(a))]
+        cta_buttons = self.index.tags('button')
         cta_elements.extend(cta_links)
         cta_elements.extend(cta_buttons)
         
@@ -171,26 +202,35 @@ class UsabilityAnalyzer:
         """Analizuje czytelność tekstu (prosta analiza)"""
         readability = {}
         
-        # Pobieranie całego tekstu ze strony
-        all_text = self.soup.get_text(" ", strip=True)
-        words = all_text.split()
-        sentences = self._count_sentences(all_text)
+        # Słowa i zdania liczone bezpośrednio z kolejnych napisów drzewa DOM,
+        # bez składania całego tekstu strony w jeden bufor
+        total_words = 0
+        total_length = 0
+        long_words = 0
+        sentence_ends = 0
+        for text in self.soup.stripped_strings:
+            for word in text.split():
+                length = len(word)
+                total_words += 1
+                total_length += length
+                long_words += length > 10
+            sentence_ends += self._count_sentence_ends(text)
+        sentences = max(sentence_ends, 1)  # Co najmniej jedno zdanie
         
         # Podstawowe metryki
-        readability["total_words"] = len(words)
+        readability["total_words"] = total_words
         readability["total_sentences"] = sentences
         
         if sentences > 0:
-            readability["words_per_sentence"] = round(len(words) / sentences, 1)
+            readability["words_per_sentence"] = round(total_words / sentences, 1)
         else:
             readability["words_per_sentence"] = 0
         
         # Długość słów
-        word_lengths = [len(word) for word in words if word]
-        if word_lengths:
-            readability["average_word_length"] = round(sum(word_lengths) / len(word_lengths), 1)
-            readability["long_words"] = sum(1 for l in word_lengths if l > 10)
-            readability["long_words_percentage"] = round((readability["long_words"] / max(len(words), 1)) * 100, 1)
+        if total_words:
+            readability["average_word_length"] = round(total_length / total_words, 1)
+            readability["long_words"] = long_words
+            readability["long_words_percentage"] = round((long_words / total_words) * 100, 1)
         else:
             readability["average_word_length"] = 0
             readability["long_words"] = 0
@@ -217,28 +257,28 @@ class UsabilityAnalyzer:
         mobile = {}
         
         # Sprawdzanie viewport meta tagu
-        viewport = self.soup.find('meta', attrs={'name': 'viewport'})
+        viewport = next((meta for meta in self.index.metas if meta.attrs.get('name') == 'viewport'), None)
         mobile["has_viewport"] = viewport is not None
         if viewport:
             mobile["viewport_content"] = viewport.get('content', '')
         
         # Sprawdzanie media queries w stylach inline
         media_queries = 0
-        for style in self.soup.find_all('style'):
+        for style in self.index.styles:
             if style.string:
-                media_queries += len(re.findall(r'@media', style.string))
+                media_queries += style.string.count('@media')
         
         mobile["media_queries"] = media_queries
         
         # Sprawdzanie elementów typu touch
-        touch_elements = self.soup.find_all(['button', 'a'], class_=re.compile(r'btn|button', re.I))
-        mobile["touch_elements"] = len(touch_elements)
+        mobile["touch_elements"] = sum(
+            1 for el in self.index.tags('button', 'a') if _TOUCH_CLASS_RE.search(_class_names(el))
+        )
         
         # Sprawdzanie elementów formularza przyjaznych dla urządzeń mobilnych
-        mobile_friendly_inputs = self.soup.find_all('input', attrs={
-            'type': re.compile(r'tel|email|number|date|datetime-local|month|search|time|url|week')
-        })
-        mobile["mobile_friendly_inputs"] = len(mobile_friendly_inputs)
+        mobile["mobile_friendly_inputs"] = sum(
+            1 for i in self.index.tags('input') if _MOBILE_INPUT_RE.search(i.attrs.get('type', ''))
+        )
         
         # Ocena użyteczności mobilnej
         mobile_score = 0
@@ -254,9 +294,7 @@ class UsabilityAnalyzer:
         self.usability["mobile"] = mobile
     
     # Metody pomocnicze
-    def _count_sentences(self, text):
-        """Liczy w przybliżeniu liczbę zdań w tekście"""
+    def _count_sentence_ends(self, text):
+        """Liczy w przybliżeniu zakończenia zdań w tekście"""
         # Prosta heurystyka: zlicz kropki, wykrzykniki i pytajniki kończące zdania
-        sentence_end_pattern = r'[.!?](?:\s|$)'
-        sentences = re.findall(sentence_end_pattern, text)
-        return max(len(sentences), 1)  # Co najmniej jedno zdanie
\ No newline at end of file
+        return sum(1 for _ in _SENTENCE_END_RE.finditer(text))
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Macierz współczynników kontrastu WCAG kompilowana przez numba.
+
+Jądro jest dostępne tylko wtedy, gdy zainstalowane są numpy i numba;
+w przeciwnym razie contrast_matrix ma wartość None, a helpers.contrast_matrix
+korzysta z wersji NumPy lub z czystego Pythona. Moduł jest importowany
+leniwie przez helpers.contrast_matrix, dopiero dla macierzy o co najmniej
+KERNEL_MIN_PAIRS parach, ponieważ sam import numba trwa ponad 100 ms.
+"""
+
+from .helpers import LUMINANCE_WEIGHTS
+
+try:
+    import numpy as np
+    from numba import njit, prange
+except ImportError:
+    np = None
+    njit = None
+
+def _luminance(rgb):
+    """Luminancja WCAG dla tablicy składowych RGB (N, 3) w zakresie 0-1"""
+    lum = np.empty(rgb.shape[0])
+    for i in range(rgb.shape[0]):
+        total = 0.0
+        for c in range(3):
+            value = rgb[i, c]
+            if value <= 0.03928:
+                linear = value / 12.92
+            else:
+                linear = ((value + 0.055) / 1.055) ** 2.4
+            total += LUMINANCE_WEIGHTS[c] * linear
+        lum[i] = total
+    return lum
+
+def _contrast_matrix(bg_rgb, txt_rgb):
+    """
+    Oblicza kontrast każdej pary kolorów z dwóch tablic RGB (N, 3) i (M, 3) w zakresie 0-1
+
+    Returns:
+        np.ndarray: macierz (N, M) współczynników kontrastu
+    """
+    bg_lum = _luminance(bg_rgb)
+    txt_lum = _luminance(txt_rgb)
+    ratios = np.empty((bg_lum.shape[0], txt_lum.shape[0]))
+    for i in prange(bg_lum.shape[0]):
+        for j in range(txt_lum.shape[0]):
+            l1 = bg_lum[i]
+            l2 = txt_lum[j]
+            if l1 > l2:
+                ratios[i, j] = (l1 + 0.05) / (l2 + 0.05)
+            else:
+                ratios[i, j] = (l2 + 0.05) / (l1 + 0.05)
+    return ratios
+
+if njit is not None:
+    _luminance = njit(cache=True)(_luminance)
+    contrast_matrix = njit(parallel=True, cache=True)(_contrast_matrix)
+else:
+    contrast_matrix = None
@@ -3,29 +3,96 @@
 
 import re
 import socket
+from functools import lru_cache
 from urllib.parse import urlparse
 
+try:
+    import numpy as np  # Opcjonalne - wektorowe obliczanie kontrastu
+except ImportError:
+    np = None
+
+# Wagi składowych RGB w luminancji względnej WCAG
+LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+# Od tej liczby par kolorów opłaca się jądro numba (koszt importu i kompilacji przy pierwszym użyciu)
+KERNEL_MIN_PAIRS = 40000
+
+# Jądro numba ładowane leniwie przy pierwszej tak dużej macierzy: None - jeszcze nie ładowano
+_contrast_kernel = None
+
+def _load_contrast_kernel():
+    """Importuje jądro numba (raz) i zwraca je, albo False, gdy numba jest niedostępna"""
+    global _contrast_kernel
+    if _contrast_kernel is None:
+        from .contrast_kernel import contrast_matrix
+        _contrast_kernel = contrast_matrix if contrast_matrix is not None else False
+    return _contrast_kernel
+
+@lru_cache(maxsize=256)
+def compile_path(path):
+    """
+    Zwraca funkcję pobierającą wartość spod ścieżki z kropkami, np. compile_path("a.b.c")(dict, default)
+    Ścieżka jest dzielona tylko raz; skompilowane funkcje są zapamiętywane.
+    """
+    keys = tuple(path.split("."))
+    
+    def getter(dictionary, default=None):
+        current = dictionary
+        for key in keys:
+            try:
+                current = current[key]
+            except (KeyError, TypeError, IndexError):
+                return default
+        return current
+    
+    return getter
+
 def safe_get(dictionary, path, default=None):
     """
     Bezpieczne pobieranie zagnieżdżonych wartości ze słownika za pomocą ścieżki z kropkami
     np. safe_get(dict, "a.b.c", "default") zwróci dict["a"]["b"]["c"] jeśli istnieje, w przeciwnym razie "default"
     """
-    keys = path.split(".")
-    current = dictionary
-    
-    for key in keys:
-        if isinstance(current, dict) and key in current:
-            current = current[key]
-        else:
-            return default
-    
-    return current
+    return compile_path(path)(dictionary, default)
 
 def extract_domain(url):
     """Wyodrębnia domenę z URL"""
     parsed = urlparse(url)
     return parsed.netloc
 
+_RGB_RE = re.compile(r'rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)')
+
+def parse_color(color):
+    """
+    Konwersja koloru z hex (#rrggbb) lub rgb(r,g,b) do składowych RGB w zakresie 0-1.
+    Nierozpoznane formaty dają czerń; niepełny zapis hex zgłasza ValueError.
+    """
+    if color.startswith("#"):
+        color = color[1:]
+        r = int(color[0:2], 16) / 255.0
+        g = int(color[2:4], 16) / 255.0
+        b = int(color[4:6], 16) / 255.0
+        return r, g, b
+    elif color.startswith("rgb"):
+        match = _RGB_RE.search(color)
+        if match:
+            r = int(match.group(1)) / 255.0
+            g = int(match.group(2)) / 255.0
+            b = int(match.group(3)) / 255.0
+            return r, g, b
+    return 0, 0, 0
+
+def adjust_color_value(value):
+    """Linearyzacja składowej sRGB"""
+    if value <= 0.03928:
+        return value / 12.92
+    else:
+        return ((value + 0.055) / 1.055) ** 2.4
+
+def get_luminance(r, g, b):
+    """Obliczanie luminancji zgodnie z WCAG"""
+    wr, wg, wb = LUMINANCE_WEIGHTS
+    return wr * adjust_color_value(r) + wg * adjust_color_value(g) + wb * adjust_color_value(b)
+
 def calculate_contrast_ratio(color1, color2):
     """
     Oblicza współczynnik kontrastu między dwoma kolorami zgodnie z WCAG
@@ -36,42 +103,8 @@ def calculate_contrast_ratio(color1, color2):
     Returns:
         float: Współczynnik kontrastu (1:1 do 21:1)
     """
-    # Konwersja z hex lub rgb() do wartości RGB
-    def parse_color(color):
-        if color.startswith("#"):
-            color = color[1:]
-            r = int(color[0:2], 16) / 255.0
-            g = int(color[2:4], 16) / 255.0
-            b = int(color[4:6], 16) / 255.0
-            return r, g, b
-        elif color.startswith("rgb"):
-            match = re.search(r'rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)', color)
-            if match:
-                r = int(match.group(1)) / 255.0
-                g = int(match.group(2)) / 255.0
-                b = int(match.group(3)) / 255.0
-                return r, g, b
-        return 0, 0, 0
-    
-    # Obliczanie luminancji zgodnie z WCAG
-    def get_luminance(r, g, b):
-        r = adjust_color_value(r)
-        g = adjust_color_value(g)
-        b = adjust_color_value(b)
-        return 0.2126 * r + 0.7152 * g + 0.0722 * b
-    
-    def adjust_color_value(value):
-        if value <= 0.03928:
-            return value / 12.92
-        else:
-            return ((value + 0.055) / 1.055) ** 2.4
-    
-    # Obliczenie luminancji dla obu kolorów
-    r1, g1, b1 = parse_color(color1)
-    r2, g2, b2 = parse_color(color2)
-    
-    l1 = get_luminance(r1, g1, b1)
-    l2 = get_luminance(r2, g2, b2)
+    l1 = get_luminance(*parse_color(color1))
+    l2 = get_luminance(*parse_color(color2))
     
     # Obliczenie współczynnika kontrastu
     if l1 > l2:
@@ -79,6 +112,92 @@ def calculate_contrast_ratio(color1, color2):
     else:
         return (l2 + 0.05) / (l1 + 0.05)
 
+def _parse_colors(colors):
+    """Zwraca pary (kolor, rgb) dla kolorów, które udało się sparsować"""
+    parsed = []
+    for color in colors:
+        try:
+            parsed.append((color, parse_color(color)))
+        except ValueError:
+            pass  # Niepełny zapis koloru (np. #fff) jest pomijany
+    return parsed
+
+def _luminance_array(rgb):
+    """Luminancja WCAG dla tablicy składowych RGB (N, 3) w zakresie 0-1"""
+    c = np.asarray(rgb, dtype=np.float64)
+    linear = np.where(c <= 0.03928, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return linear @ np.asarray(LUMINANCE_WEIGHTS)
+
+def calculate_contrast_ratios(colors1, colors2):
+    """
+    Oblicza współczynniki kontrastu dla par kolorów (colors1[i], colors2[i])
+    
+    Wersja wsadowa calculate_contrast_ratio: kolory są parsowane raz, a luminancje
+    i współczynniki liczone wektorowo przy dostępnym NumPy.
+    
+    Args:
+        colors1, colors2: Listy kolorów tej samej długości w formacie hex (#rrggbb) lub rgb(r,g,b)
+        
+    Returns:
+        list: Współczynniki kontrastu kolejnych par
+    """
+    if len(colors1) != len(colors2):
+        raise ValueError("Listy kolorów muszą mieć tę samą długość")
+    rgb1 = [parse_color(color) for color in colors1]
+    rgb2 = [parse_color(color) for color in colors2]
+    if not rgb1:
+        return []
+    
+    if np is not None:
+        lum1 = _luminance_array(rgb1)
+        lum2 = _luminance_array(rgb2)
+        ratios = (np.maximum(lum1, lum2) + 0.05) / (np.minimum(lum1, lum2) + 0.05)
+        return ratios.tolist()
+    
+    ratios = []
+    for c1, c2 in zip(rgb1, rgb2):
+        l1 = get_luminance(*c1)
+        l2 = get_luminance(*c2)
+        ratios.append((max(l1, l2) + 0.05) / (min(l1, l2) + 0.05))
+    return ratios
+
+def contrast_matrix(colors1, colors2):
+    """
+    Oblicza współczynniki kontrastu dla wszystkich par kolorów z dwóch list
+    
+    Przy dostępnym NumPy luminancje i cała macierz liczone są wektorowo,
+    a dla dużej liczby par przez jądro numba (contrast_kernel);
+    bez NumPy obliczenia wykonywane są w czystym Pythonie.
+    
+    Returns:
+        tuple: (kolory1, kolory2, macierz) - macierz[i][j] to kontrast kolory1[i] z kolory2[j];
+               kolory, których nie udało się sparsować, są pominięte
+    """
+    parsed1 = _parse_colors(colors1)
+    parsed2 = _parse_colors(colors2)
+    names1 = [color for color, rgb in parsed1]
+    names2 = [color for color, rgb in parsed2]
+    if not names1 or not names2:
+        return names1, names2, []
+    
+    if len(names1) * len(names2) >= KERNEL_MIN_PAIRS and _load_contrast_kernel():
+        ratios = _contrast_kernel(np.asarray([rgb for color, rgb in parsed1], dtype=np.float64),
+                                  np.asarray([rgb for color, rgb in parsed2], dtype=np.float64))
+        return names1, names2, ratios.tolist()
+    
+    if np is not None:
+        lum1 = _luminance_array([rgb for color, rgb in parsed1])
+        lum2 = _luminance_array([rgb for color, rgb in parsed2])
+        a = lum1[:, None]
+        b = lum2[None, :]
+        ratios = (np.maximum(a, b) + 0.05) / (np.minimum(a, b) + 0.05)
+        return names1, names2, ratios.tolist()
+    
+    lum1 = [get_luminance(*rgb) for color, rgb in parsed1]
+    lum2 = [get_luminance(*rgb) for color, rgb in parsed2]
+    ratios = [[(max(l1, l2) + 0.05) / (min(l1, l2) + 0.05) for l2 in lum2] for l1 in lum1]
+    return names1, names2, ratios
+
 def check_dns_lookup_time(hostname):
     """Sprawdza czas wyszukiwania DNS dla podanej nazwy hosta"""
     import time
@@ -103,10 +222,11 @@ def extract_css_colors(css_content):
     Returns:
         dict: Słownik kolorów tła i tekstu
     """
+    # Słowniki jako zbiory z zachowaniem kolejności pierwszego wystąpienia
     colors = {
-        "background": [],
-        "text": [],
-        "link": []
+        "background": {},
+        "text": {},
+        "link": {}
     }
     
     background_patterns = [
@@ -128,27 +248,23 @@ def extract_css_colors(css_content):
             if match and match.group(2):
                 color = match.group(2).strip()
                 if color and color != 'transparent' and color != 'inherit' and color != 'initial':
-                    colors["background"].append(color)
+                    colors["background"][color] = None
     
     for pattern in text_patterns:
         for match in re.finditer(pattern, css_content):
             if match and match.group(1):
                 color = match.group(1).strip()
                 if color and color != 'inherit' and color != 'initial':
-                    colors["text"].append(color)
+                    colors["text"][color] = None
     
     for pattern in link_patterns:
         for match in re.finditer(pattern, css_content):
             if match and match.group(1):
                 color = match.group(1).strip()
                 if color and color != 'inherit' and color != 'initial':
-                    colors["link"].append(color)
-    
-    # Usuwanie duplikatów
-    for key in colors:
-        colors[key] = list(set(colors[key]))
+                    colors["link"][color] = None
     
-    return colors
+    return {key: list(found) for key, found in colors.items()}
 
 def check_heading_hierarchy(headings):
     """
@@ -163,15 +279,15 @@ def check_heading_hierarchy(headings):
     if not headings:
         return False
     
-    levels = [level for level, text in headings]
-    
-    # Sprawdź, czy istnieje H1
-    if 1 not in levels:
-        return True
-    
-    # Sprawdź, czy nie ma przeskoczonych poziomów
-    for i in range(len(levels) - 1):
-        if levels[i+1] - levels[i] > 1:
+    # Jedno przejście: przeskoczony poziom kończy sprawdzanie od razu
+    has_h1 = False
+    previous = None
+    for level, text in headings:
+        if level == 1:
+            has_h1 = True
+        if previous is not None and level - previous > 1:
             return True
+        previous = level
     
-    return False
\ No newline at end of file
+    # Brak H1 to również problem
+    return not has_h1
\ No newline at end of file
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serializacja JSON z koderem wybieranym raz, przy imporcie modułu.
+
+Kolejność wyboru: orjson (Rust) -> ujson (C) -> json (biblioteka standardowa).
+Wszystkie warianty zwracają bytes w UTF-8 (bez zamiany znaków na sekwencje \\u),
+gotowe do pojedynczego zapisu do pliku otwartego w trybie binarnym.
+Wcięcie jest ujednolicone do 2 spacji, ponieważ tylko takie obsługuje orjson.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+
+    def dumps(obj, indent=False):
+        """Serializuje obiekt do JSON (bytes)"""
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+elif ujson is not None:
+    JSON_BACKEND = "ujson"
+
+    def dumps(obj, indent=False):
+        """Serializuje obiekt do JSON (bytes)"""
+        return ujson.dumps(obj, indent=2 if indent else 0, ensure_ascii=False,
+                           escape_forward_slashes=False).encode('utf-8')
+
+else:
+    JSON_BACKEND = "json"
+
+    def dumps(obj, indent=False):
+        """Serializuje obiekt do JSON (bytes)"""
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def dump_to_file(obj, path, indent=True):
+    """Zapisuje obiekt jako JSON do pliku jednym wywołaniem write"""
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, indent=indent))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import cached_property
+from bs4 import CData, NavigableString, Tag
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+FORM_FIELD_TAGS = ('input', 'select', 'textarea')
+HTML5_LANDMARKS = ('header', 'nav', 'main', 'aside', 'footer', 'section', 'article')
+
+@dataclass
+class SoupIndex:
+    """
+    Indeks elementów drzewa DOM budowany jednym przejściem.
+    Moduły analizy współdzielą jeden indeks zamiast wielokrotnie przeszukiwać
+    całe drzewo wywołaniami find_all.
+    attr_counts zlicza elementy posiadające dany atrybut (np. aria-label),
+    role_counts - elementy według wartości atrybutu role,
+    label_for - identyfikatory pól wskazywane przez <label for>,
+    a text_length to długość tekstu zwracanego przez soup.get_text().
+    """
+    elements: list = field(default_factory=list)
+    by_tag: dict = field(default_factory=dict)
+    attr_counts: Counter = field(default_factory=Counter)
+    role_counts: Counter = field(default_factory=Counter)
+    label_for: set = field(default_factory=set)
+    text_length: int = 0
+
+    @classmethod
+    def from_soup(cls, soup):
+        """Buduje indeks jednym przejściem po soup.descendants"""
+        elements = []
+        by_tag = defaultdict(list)
+        attr_counts = Counter()
+        role_counts = Counter()
+        label_for = set()
+        text_length = 0
+        # Te same typy napisów, które uwzględnia get_text() (bez komentarzy, skryptów i stylów)
+        text_types = getattr(soup, 'interesting_string_types', (NavigableString, CData))
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                if type(node) in text_types:
+                    text_length += len(node)
+                continue
+            elements.append(node)
+            by_tag[node.name].append(node)
+            if node.attrs:
+                attr_counts.update(node.attrs.keys())
+                role = node.attrs.get('role')
+                if role is not None:
+                    role_counts[role] += 1
+                if node.name == 'label' and node.attrs.get('for'):
+                    label_for.add(node.attrs['for'])
+        return cls(elements, dict(by_tag), attr_counts, role_counts, label_for, text_length)
+
+    def tags(self, *names):
+        """Zwraca elementy o podanych nazwach w kolejności występowania w dokumencie"""
+        if len(names) == 1:
+            return self.by_tag.get(names[0], [])
+        wanted = set(names)
+        return [el for el in self.elements if el.name in wanted]
+
+    def count(self, *names):
+        """Zlicza elementy o podanych nazwach bez przeglądania całego dokumentu"""
+        return sum(len(self.by_tag.get(name, ())) for name in names)
+
+    def first(self, name):
+        """Zwraca pierwszy element o podanej nazwie lub None"""
+        found = self.by_tag.get(name)
+        return found[0] if found else None
+
+    @property
+    def imgs(self):
+        return self.tags('img')
+
+    @property
+    def inputs(self):
+        return self.tags(*FORM_FIELD_TAGS)
+
+    @property
+    def links(self):
+        return self.tags('a')
+
+    @property
+    def forms(self):
+        return self.tags('form')
+
+    @property
+    def headings(self):
+        return self.tags(*HEADING_TAGS)
+
+    @property
+    def scripts(self):
+        return self.tags('script')
+
+    @property
+    def styles(self):
+        return self.tags('style')
+
+    @property
+    def metas(self):
+        return self.tags('meta')
+
+    @cached_property
+    def external_scripts(self):
+        """Znaczniki <script> z atrybutem src"""
+        return [script for script in self.scripts if script.has_attr('src')]
+
+    @cached_property
+    def inline_scripts(self):
+        """Znaczniki <script> bez atrybutu src"""
+        return [script for script in self.scripts if not script.has_attr('src')]
+
+    @cached_property
+    def stylesheet_links(self):
+        """Znaczniki <link rel="stylesheet">"""
+        return [link for link in self.tags('link') if 'stylesheet' in link.get('rel', [])]
+
+    @cached_property
+    def style_text(self):
+        """Połączona zawartość wszystkich znaczników <style>, składana raz dla wszystkich analizatorów"""
+        return "".join(style.get_text() for style in self.styles)